@@ -0,0 +1,38 @@
+"""Compare `Countdown.format` (compiled `RenderPlan`) against the uncompiled `str.format` path.
+
+Run from the repository root: `python benchmarks/bench_format.py`
+
+"""
+import sys
+sys.path.append("src")
+import countdown
+import random
+import timeit
+
+TEMPLATES = {
+    "default": countdown.Countdown.default,
+    "complex": countdown.Countdown(
+        "T{z}{y.Ea}{y}[_]{Eb}{M}{Ec}{p}{w}{Ed}{P}{d}{Ee}{ep}{h}{Ef}{eP}{m}{Eg}{Ep}{S}{Eh}{EP}{s}"
+        "{Ei}{u}{Ej}", Ea="[YL]", Eb="[YR]", Ec="[mo]", Ed="[w]", Ee="[d]", Ef="[h]", Eg="[m]",
+        Eh="[s]", Ei="[ms]", Ej="[microseconds] "),
+    "callable": countdown.Countdown("{h}{hd} {m}{md} {S}{Sd}", hd="h", md="m",
+                                    Sd=lambda tval: "s" if tval.S != 1 else " second"),
+}
+
+
+def main(number: int = 20_000) -> None:
+    rng = random.Random(0)
+    values = [rng.randint(0, 10 ** 15) for _ in range(number)]
+    for name, cd in TEMPLATES.items():
+        for value in values:
+            assert cd.format(value) == cd._format_uncompiled(value)
+        compiled = min(timeit.repeat(lambda: [cd.format(v) for v in values], number=1, repeat=5))
+        uncompiled = min(timeit.repeat(lambda: [cd._format_uncompiled(v) for v in values],
+                                       number=1, repeat=5))
+        print(f"{name:>10}: uncompiled {uncompiled / number * 1e6:7.2f} us/call, "
+              f"compiled {compiled / number * 1e6:7.2f} us/call "
+              f"({uncompiled / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure the cold import time of `countdown` with `python -X importtime` and check it against
+`BUDGET_US`, and check that the modules in `LAZY_MODULES` are not imported. Wall-clock import time
+depends on the machine and on whether bytecode is cached, so the default budget is several times
+the typical import time (about 20 ms) and only catches gross regressions such as an eager import
+of a heavy dependency; set `COUNTDOWN_IMPORT_BUDGET_US` to tighten or loosen it.
+
+Run from the repository root: `python benchmarks/bench_import.py`
+
+"""
+import subprocess
+import sys
+import os
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# cumulative microseconds for `import countdown`; override with COUNTDOWN_IMPORT_BUDGET_US
+BUDGET_US = int(os.environ.get("COUNTDOWN_IMPORT_BUDGET_US", 100_000))
+# modules that must only be imported when they are actually needed
+LAZY_MODULES = ("plogging", "prepr", "logging", "asyncio", "inspect", "numpy",
+                "concurrent.futures", "countdown._numpy", "countdown._parallel",
+                "countdown._buffer", "countdown._calendar", "countdown._ticker",
+                "countdown._scheduler", "countdown._board")
+
+
+def import_time_us() -> tuple[int, dict[str, int]]:
+    """Import `countdown` in a fresh interpreter and return its cumulative import time in
+    microseconds, along with the self time of every module imported.
+    
+    """
+    code = f"import sys; sys.path.insert(0, {SRC!r}); import countdown"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True,
+                          text=True, check=True)
+    total = 0
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+        if name.strip() == "countdown":
+            total = int(cumulative_us)
+    return total, modules
+
+
+def lazy_modules_imported() -> list[str]:
+    """Return the modules in `LAZY_MODULES` that a bare `import countdown` pulls in.
+    
+    """
+    code = (f"import sys; sys.path.insert(0, {SRC!r}); import countdown; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def check(repeat: int = 3) -> int:
+    """Return the best cumulative import time over `repeat` runs, raising `AssertionError` if it
+    exceeds `BUDGET_US`.
+    
+    """
+    best = min(import_time_us()[0] for _ in range(repeat))
+    assert best <= BUDGET_US, f"import countdown took {best} us (budget {BUDGET_US} us)"
+    return best
+
+
+def main(repeat: int = 5) -> None:
+    runs = [import_time_us() for _ in range(repeat)]
+    total, modules = min(runs, key=lambda run: run[0])
+    print(f"import countdown: {total} us (best of {repeat}, budget {BUDGET_US} us)")
+    for name, self_us in sorted(modules.items(), key=lambda item: -item[1])[:10]:
+        print(f"{self_us:>8} us  {name}")
+    print("lazy modules imported:", ", ".join(lazy_modules_imported()) or "none")
+
+
+if __name__ == "__main__":
+    main()
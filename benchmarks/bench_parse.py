@@ -0,0 +1,42 @@
+"""Compare `Countdown.parse` with cached parse patterns against rebuilding them on every call.
+
+Run from the repository root: `python benchmarks/bench_parse.py`
+
+"""
+import sys
+sys.path.append("src")
+from countdown import formatter
+import countdown
+import random
+import timeit
+
+TEMPLATES = {
+    "default": countdown.Countdown.default,
+    "complex": countdown.Countdown(
+        "T{z}{y.Ea}{y}[_]{Eb}{M}{Ec}{p}{w}{Ed}{P}{d}{Ee}{ep}{h}{Ef}{eP}{m}{Eg}{Ep}{S}{Eh}{EP}{s}"
+        "{Ei}{u}{Ej}", Ea="[YL]", Eb="[YR]", Ec="[mo]", Ed="[w]", Ee="[d]", Ef="[h]", Eg="[m]",
+        Eh="[s]", Ei="[ms]", Ej="[microseconds] "),
+}
+
+
+def main(number: int = 5_000) -> None:
+    rng = random.Random(0)
+    for name, cd in TEMPLATES.items():
+        strings = [cd.format(rng.randint(0, 10 ** 15)) for _ in range(number)]
+
+        def uncached() -> None:
+            for s in strings:
+                cd._parse_with(s, formatter.build_parse_info(cd.flags, cd._defaults))
+
+        def cached() -> None:
+            for s in strings:
+                cd.parse(s)
+
+        before = min(timeit.repeat(uncached, number=1, repeat=3))
+        after = min(timeit.repeat(cached, number=1, repeat=3))
+        print(f"{name:>10}: uncached {number / before:9.0f} parses/s, "
+              f"cached {number / after:9.0f} parses/s ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure the throughput of `Countdown.format` on a single instance shared by 1 to N threads,
+checking every result against a single-threaded reference. On a free-threaded build (e.g.
+`python3.13t`) throughput should scale with the number of cores; with the GIL it stays flat.
+
+Run from the repository root: `python benchmarks/bench_threads.py [max_threads]`
+
+"""
+import sys
+sys.path.append("src")
+import countdown
+import sysconfig
+import threading
+import random
+import time
+import os
+
+TEMPLATES = {
+    "default": lambda: countdown.Countdown.default,
+    "cached": lambda: countdown.Countdown("{d}{dd} {h}{hd} {m}{md} {S}{Sd}", dd="d", hd="h",
+                                          md="m", Sd="s", cache_size=4096),
+    "callable": lambda: countdown.Countdown("{h}{hd} {m}{md} {S}{Sd}", hd="h", md="m",
+                                            Sd=lambda tval: "s" if tval.S != 1 else " second"),
+}
+
+
+def build_info() -> str:
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    return (f"Python {sys.version.split()[0]} ({'free-threaded' if free_threaded else 'standard'}"
+            f" build, GIL {'enabled' if gil else 'disabled'}), {os.cpu_count()} CPUs")
+
+
+def thread_counts(max_threads: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_threads:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_threads:
+        counts.append(max_threads)
+    return counts
+
+
+def run(cd: countdown.Countdown, threads: int, values: list[int],
+        expected: list[str]) -> float:
+    """Format `values` in each of `threads` threads sharing `cd` (each starting at a different
+    offset) and return the total formats per second. Raises `AssertionError` if any thread gets
+    a result that differs from `expected`.
+
+    """
+    barrier = threading.Barrier(threads + 1)
+    errors: list[str] = []
+    size = len(values)
+
+    def work(offset: int) -> None:
+        order = values[offset:] + values[:offset]
+        wanted = expected[offset:] + expected[:offset]
+        barrier.wait()
+        results = [cd.format(value) for value in order]
+        if results != wanted:
+            errors.append(f"thread {offset} got a wrong result")
+
+    workers = [threading.Thread(target=work, args=(i * size // threads,))
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    assert not errors, errors
+    return threads * size / elapsed
+
+
+def main(max_threads: int = None, number: int = 20_000) -> None:
+    max_threads = max_threads or os.cpu_count() or 1
+    rng = random.Random(0)
+    # values repeat so that the render cache sees hits as well as misses
+    values = [rng.randint(0, 10 ** 11) // 1_000_000 * 1_000_000 for _ in range(number)]
+    print(build_info())
+    for name, factory in TEMPLATES.items():
+        cd = factory()
+        expected = [cd.format(value) for value in values]
+        base = None
+        for threads in thread_counts(max_threads):
+            rate = max(run(cd, threads, values, expected) for _ in range(3))
+            base = base or rate
+            print(f"{name:>10} x{threads:<3} {rate:12,.0f} formats/s ({rate / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
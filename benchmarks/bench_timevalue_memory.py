@@ -0,0 +1,56 @@
+"""Compare the memory used by `TimeValue` objects, a `TimeValueBatch`, and an equivalent class
+using a per-instance `__dict__` (the layout `TimeValue` had before it used `__slots__`).
+
+Run from the repository root: `python benchmarks/bench_timevalue_memory.py`
+
+"""
+import sys
+sys.path.append("src")
+import countdown
+import tracemalloc
+import random
+
+
+class DictTimeValue:
+    def __init__(self, z=1, y=None, M=None, w=None, d=None, h=None, m=None, S=None, s=None,
+                 u=None) -> None:
+        self.z = z
+        self.y = y
+        self.M = M
+        self.w = w
+        self.d = d
+        self.h = h
+        self.m = m
+        self.S = S
+        self.s = s
+        self.u = u
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main(number: int = 100_000) -> None:
+    rng = random.Random(0)
+    components = [dict(h=rng.randint(0, 23), m=rng.randint(0, 59), S=rng.randint(0, 59),
+                       s=rng.randint(0, 999)) for _ in range(number)]
+    tvals = [countdown.TimeValue(**c) for c in components]
+    results = {
+        "dict-based": measure(lambda: [DictTimeValue(**c) for c in components]),
+        "TimeValue": measure(lambda: [countdown.TimeValue(**c) for c in components]),
+        "TimeValueBatch": measure(lambda: countdown.TimeValueBatch("hmSs", tvals)),
+    }
+    for name, size in results.items():
+        print(f"{name:>15}: {size / number:6.1f} bytes/value")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""pytest-benchmark entry point for the scenarios in `countdown.bench`.
+
+Run from the repository root: `python -m pytest benchmarks/test_bench.py`
+
+"""
+import sys
+sys.path.append("src")
+import pytest
+from countdown import bench
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("name", list(bench.SCENARIOS))
+def test_scenario(benchmark, name: str) -> None:
+    benchmark(bench.SCENARIOS[name](100))
@@ -19,12 +19,35 @@ __download_url__ = "https://pypi.org/project/countdown"
 
 __all__ = (
     "Countdown",
+    "CountdownScheduler",
+    "DeadlineBoard",
+    "Instrumentation",
     "TimeValue",
+    "TimeValueBatch",
+    "depends_on",
     "formatter",
     "constants"
 )
 
 from ._countdown import Countdown
-from .models import TimeValue
+from .instrumentation import Instrumentation
+from .models import TimeValue, TimeValueBatch, depends_on
 from . import formatter
 from . import constants
+import typing
+
+if typing.TYPE_CHECKING:
+    from ._scheduler import CountdownScheduler
+    from ._board import DeadlineBoard
+
+
+def __getattr__(name: str) -> typing.Any:
+    # these exports are only imported on first access, to keep `import countdown` fast
+    if name == "CountdownScheduler":
+        from ._scheduler import CountdownScheduler as value
+    elif name == "DeadlineBoard":
+        from ._board import DeadlineBoard as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -0,0 +1,198 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+# Command-line interface: `python -m countdown {format,parse} [options] [INPUT]`. Input is read
+# in large blocks of lines and each block goes through the batch code paths
+# (`Countdown.format_many` / `Countdown.parse_many`, or their `_parallel` variants).
+
+from typing import Union
+from . import _countdown
+from . import exceptions
+from . import constants
+import argparse
+import itertools
+import typing
+import sys
+import re
+import io
+
+BUFFER_SIZE = 1 << 20
+BATCH_SIZE = 65_536
+_timedelta_re = re.compile(r"\s*(?P<sign>-)?(?:(?P<days>\d+) days?, )?(?P<hours>\d+):"
+                           r"(?P<minutes>\d\d):(?P<seconds>\d\d)(?:\.(?P<fraction>\d{1,6}))?\s*")
+
+
+def timedelta_microseconds(text: str) -> int:
+    """Parse the output of `str(datetime.timedelta)` (e.g. `1 day, 2:03:04.000005`) into integer
+    microseconds. A leading `-` negates the whole value.
+    
+    """
+    match = _timedelta_re.fullmatch(text)
+    if match is None:
+        raise ValueError(f"Invalid timedelta: '{text}'")
+    days, hours, minutes, seconds, fraction = match.group("days", "hours", "minutes", "seconds",
+                                                          "fraction")
+    total = ((int(days or 0) * 24 + int(hours)) * 60 + int(minutes)) * 60 + int(seconds)
+    total = total * 1_000_000 + int((fraction or "0").ljust(6, "0"))
+    return -total if match.group("sign") else total
+
+
+def _number(text: str) -> Union[int, float]:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _to_values(lines: list[str], unit: str) -> list[Union[int, float]]:
+    # blank lines are skipped
+    if unit == "timedelta":
+        return [timedelta_microseconds(line) for line in lines if line.strip()]
+    try:
+        # fast path: every line is an integer
+        return list(map(int, lines))
+    except ValueError:
+        return [_number(line) for line in lines if line.strip()]
+
+
+def _batches(stream: typing.BinaryIO) -> typing.Iterator[list[str]]:
+    # decode as UTF-8 regardless of the locale, like the output is encoded
+    reader = io.TextIOWrapper(stream, encoding="utf-8", newline=None)
+    try:
+        while True:
+            lines = reader.readlines(BUFFER_SIZE)
+            if not lines:
+                return
+            yield [line.rstrip("\n") for line in lines]
+    finally:
+        # otherwise `stream` (e.g. stdin) is closed along with the wrapper
+        reader.detach()
+
+
+def _parse_defaults(pairs: list[str]) -> dict[str, str]:
+    defaults = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise argparse.ArgumentTypeError(f"Invalid default (expected KEY=VALUE): '{pair}'")
+        defaults[key] = value
+    return defaults
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m countdown",
+                                     description="Format durations into countdown strings, or "
+                                                 "parse countdown strings back into integer "
+                                                 "microseconds, one per line.")
+    parser.add_argument("mode", choices=("format", "parse"))
+    parser.add_argument("input", nargs="?", default="-",
+                        help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-f", "--fmt", help="the format string (default: Countdown.default)")
+    parser.add_argument("-D", "--default", action="append", default=[], metavar="KEY=VALUE",
+                        help="a default for a field in the format string (repeatable)")
+    parser.add_argument("--keep-empty", action="store_true",
+                        help="do not remove units that are 0 (remove_empty=False)")
+    parser.add_argument("--max-value", type=int, help="the maximum value of each unit")
+    parser.add_argument("--no-strip", action="store_true",
+                        help="do not strip the output (strip_output=False)")
+    parser.add_argument("-u", "--unit", default="microseconds",
+                        choices=(*constants.MICROSECONDS_IN_UNIT, "timedelta"),
+                        help="the unit of the input numbers when formatting, or 'timedelta' for "
+                             "str(timedelta) input (default: %(default)s)")
+    parser.add_argument("--strict", action="store_true", help="use strict parsing")
+    parser.add_argument("--errors", choices=("raise", "skip", "sentinel"), default="raise",
+                        help="what to do with lines that fail to parse (default: %(default)s)")
+    parser.add_argument("--sentinel", default="", help="output for lines that fail to parse "
+                                                       "with --errors=sentinel")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (default: %(default)s)")
+    return parser
+
+
+def run(args: argparse.Namespace, stdin: typing.BinaryIO, stdout: typing.BinaryIO) -> None:
+    if args.fmt is None:
+        if args.default:
+            raise argparse.ArgumentTypeError("--default requires --fmt")
+        countdown = _countdown.Countdown.default
+    else:
+        countdown = _countdown.Countdown(args.fmt, not args.keep_empty, args.max_value,
+                                         not args.no_strip, **_parse_defaults(args.default))
+    unit = "microseconds" if args.unit == "timedelta" else args.unit
+    write = stdout.write
+    batches = _batches(stdin)
+    if args.mode == "format":
+        values = itertools.chain.from_iterable(_to_values(lines, args.unit) for lines in batches)
+        if args.workers == 1:
+            results = countdown.iformat(values, unit=unit)
+        else:
+            results = countdown.format_parallel(values, workers=args.workers, unit=unit)
+    else:
+        lines = itertools.chain.from_iterable(batches)
+        kwargs = dict(strict=args.strict, as_int=True, errors=args.errors,
+                      sentinel=args.sentinel)
+        if args.workers == 1:
+            results = countdown.parse_many(lines, **kwargs)
+        else:
+            results = countdown.parse_parallel(lines, workers=args.workers, **kwargs)
+        results = map(str, results)
+    while True:
+        batch = list(itertools.islice(results, BATCH_SIZE))
+        if not batch:
+            break
+        batch.append("")
+        write("\n".join(batch).encode())
+
+
+def main(argv: typing.Sequence[str] = None, stdin: typing.BinaryIO = None,
+         stdout: typing.BinaryIO = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    files: list[typing.BinaryIO] = []
+    try:
+        if stdin is None:
+            stdin = sys.stdin.buffer if args.input == "-" else open(args.input, "rb", BUFFER_SIZE)
+            if args.input != "-":
+                files.append(stdin)
+        if stdout is None:
+            stdout = sys.stdout.buffer if args.output == "-" else open(args.output, "wb",
+                                                                        BUFFER_SIZE)
+            if args.output != "-":
+                files.append(stdout)
+        run(args, stdin, stdout)
+        stdout.flush()
+    except (ValueError, argparse.ArgumentTypeError) as exc:
+        parser.exit(2, f"{parser.prog}: error: {exc}\n")
+    except exceptions.ParseError as exc:
+        parser.exit(1, f"{parser.prog}: error: {exc}\n")
+    except BrokenPipeError:
+        return 1
+    finally:
+        for f in files:
+            f.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import _ticker
+import datetime
+import bisect
+import typing
+
+if typing.TYPE_CHECKING:
+    from ._countdown import Countdown
+
+Deadline = Union[datetime.datetime, int, float]
+
+
+class DeadlineBoard:
+    """A set of keyed deadlines rendered with the same `Countdown` template. Deadlines are kept
+    as integer microseconds since the epoch in a sorted list (with the keys in a parallel list),
+    so finding the deadlines in a time window is a pair of binary searches, expired deadlines
+    are always a prefix that can be evicted with a single slice deletion, and a whole board (or
+    any range of it) is rendered against a single read of the clock.
+
+    Example Usage
+    -------------
+    ```
+    >>> board = DeadlineBoard(Countdown.default, {auction.id: auction.ends_at
+    ...                                           for auction in auctions})
+    >>> board.render()
+    [(17, '3 seconds'), (4, '1 minute and 2 seconds'), ...]
+    >>> board.expiring_within(60)
+    [17, 4]
+    >>> board.evict_expired()
+    ```
+    
+    """
+    def __init__(self, countdown: "Countdown",
+                 deadlines: Union[typing.Mapping[typing.Hashable, Deadline],
+                                  typing.Iterable[tuple[typing.Hashable, Deadline]]] = ()
+                 ) -> None:
+        self.countdown = countdown
+        self._deadlines: list[int] = []
+        self._keys: list[typing.Hashable] = []
+        self._index: dict[typing.Hashable, int] = {}
+        self.update(deadlines)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> typing.Iterator[typing.Hashable]:
+        return iter(self._keys.copy())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.countdown!r}, <{len(self)} deadlines>)"
+
+    def deadline(self, key: typing.Hashable) -> int:
+        """The deadline of `key` in microseconds since the epoch (`KeyError` if there is none).
+        
+        """
+        return self._index[key]
+
+    def items(self) -> list[tuple[typing.Hashable, int]]:
+        """The `(key, deadline)` pairs of the board, ordered by deadline.
+        
+        """
+        return list(zip(self._keys, self._deadlines))
+
+    def _position(self, key: typing.Hashable, deadline: int) -> int:
+        deadlines = self._deadlines
+        i = bisect.bisect_left(deadlines, deadline)
+        keys = self._keys
+        while keys[i] != key:
+            i += 1
+        return i
+
+    def add(self, key: typing.Hashable, deadline: Deadline) -> None:
+        """Add the deadline of `key` (a datetime, or seconds since the epoch), replacing its
+        current deadline if it already has one.
+        
+        """
+        value = _ticker.to_epoch_us(deadline)
+        if key in self._index:
+            self.remove(key)
+        i = bisect.bisect_right(self._deadlines, value)
+        self._deadlines.insert(i, value)
+        self._keys.insert(i, key)
+        self._index[key] = value
+
+    def update(self, deadlines: Union[typing.Mapping[typing.Hashable, Deadline],
+                                      typing.Iterable[tuple[typing.Hashable, Deadline]]]) -> None:
+        """Add many deadlines at once (from a mapping or an iterable of `(key, deadline)` pairs).
+        The board is re-sorted once, instead of inserting the deadlines one by one.
+        
+        """
+        if isinstance(deadlines, typing.Mapping):
+            deadlines = deadlines.items()
+        index = self._index
+        for key, deadline in deadlines:
+            index.pop(key, None)
+            index[key] = _ticker.to_epoch_us(deadline)
+        pairs = sorted(index.items(), key=lambda pair: pair[1])
+        self._keys = [key for key, _ in pairs]
+        self._deadlines = [deadline for _, deadline in pairs]
+
+    def remove(self, key: typing.Hashable) -> None:
+        """Remove the deadline of `key` (`KeyError` if there is none).
+        
+        """
+        i = self._position(key, self._index.pop(key))
+        del self._deadlines[i]
+        del self._keys[i]
+
+    def discard(self, key: typing.Hashable) -> None:
+        """Remove the deadline of `key` if it has one.
+        
+        """
+        if key in self._index:
+            self.remove(key)
+
+    def clear(self) -> None:
+        """Remove every deadline.
+        
+        """
+        self._deadlines.clear()
+        self._keys.clear()
+        self._index.clear()
+
+    def window(self, seconds: Union[int, float], *, now: int = None) -> tuple[int, int]:
+        """The `(start, stop)` positions of the deadlines that expire within the next `seconds`,
+        i.e. after `now` (epoch microseconds; defaults to the current time) and at most
+        `seconds` later.
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        deadlines = self._deadlines
+        start = bisect.bisect_right(deadlines, now)
+        return start, bisect.bisect_right(deadlines, now + round(seconds * 1_000_000), start)
+
+    def expiring_within(self, seconds: Union[int, float], *,
+                        now: int = None) -> list[typing.Hashable]:
+        """The keys of the deadlines that expire within the next `seconds` (see `.window`),
+        ordered by deadline.
+        
+        """
+        start, stop = self.window(seconds, now=now)
+        return self._keys[start:stop]
+
+    def expired(self, *, now: int = None) -> list[typing.Hashable]:
+        """The keys of the deadlines that have been reached at `now` (epoch microseconds;
+        defaults to the current time), ordered by deadline.
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        return self._keys[:bisect.bisect_right(self._deadlines, now)]
+
+    def evict_expired(self, *, now: int = None) -> list[typing.Hashable]:
+        """Remove every deadline that has been reached at `now` (see `.expired`) and return
+        their keys.
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        stop = bisect.bisect_right(self._deadlines, now)
+        keys = self._keys[:stop]
+        del self._deadlines[:stop]
+        del self._keys[:stop]
+        index = self._index
+        for key in keys:
+            del index[key]
+        return keys
+
+    def render(self, start: int = 0, stop: int = None, *, now: int = None,
+               ignore: bool = False) -> list[tuple[typing.Hashable, str]]:
+        """Render the deadlines at positions `start` to `stop` (as in a slice; the whole board
+        by default) against a single clock read `now` (epoch microseconds; defaults to the
+        current time), returning `(key, text)` pairs ordered by deadline. Expired deadlines are
+        rendered as 0.
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        deadlines = self._deadlines[start:stop]
+        texts = self.countdown.format_many([deadline - now if deadline > now else 0
+                                            for deadline in deadlines], ignore=ignore)
+        return list(zip(self._keys[start:stop], texts))
+
+    def render_within(self, seconds: Union[int, float], *, now: int = None,
+                      ignore: bool = False) -> list[tuple[typing.Hashable, str]]:
+        """Same as `.render`, but only for the deadlines that expire within the next `seconds`
+        (see `.window`).
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        start, stop = self.window(seconds, now=now)
+        return self.render(start, stop, now=now, ignore=ignore)
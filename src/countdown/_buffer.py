@@ -0,0 +1,139 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+import typing
+import array
+import sys
+import io
+
+if typing.TYPE_CHECKING:
+    from ._countdown import Countdown
+
+ITEMSIZE = 8
+
+
+# buffer formats that are reinterpreted byte-wise as int64 values
+BYTE_FORMATS = ("B", "b", "c")
+# formats of signed integers in native byte order (only used if they are 8 bytes wide)
+INT64_FORMATS = ("q", "l", "@q", "@l", "=q", "=l",
+                 ("<" if sys.byteorder == "little" else ">") + "q")
+
+
+def is_raw(buf: typing.Any) -> bool:
+    """Whether `buf` is an untyped (byte) buffer, which `int64_view` reinterprets byte-wise.
+    
+    """
+    with memoryview(buf) as view:
+        return view.format in BYTE_FORMATS
+
+
+def int64_view(buf: typing.Any) -> memoryview:
+    """Return a memoryview of `buf` (any buffer-protocol object) as native int64 values, without
+    copying. Buffers that are already typed as 8-byte signed integers are used as-is, and byte
+    buffers (formats `B`, `b` and `c`) are reinterpreted byte-wise, in which case they must be
+    C-contiguous with a length that is a multiple of 8 bytes. `TypeError` is raised for buffers
+    of any other type (e.g. `array('d')` or `array('i')`), rather than reading garbage values.
+    
+    """
+    view = memoryview(buf)
+    if view.format in INT64_FORMATS and view.itemsize == ITEMSIZE:
+        if view.ndim == 1 and view.format in ("q", "l"):
+            return view
+    elif view.format not in BYTE_FORMATS:
+        message = (f"Expected a buffer of int64 values or bytes, got format '{view.format}' "
+                   f"with item size {view.itemsize}")
+        view.release()
+        raise TypeError(message)
+    if not view.c_contiguous:
+        raise ValueError("Buffer must be C-contiguous")
+    if view.nbytes % ITEMSIZE:
+        raise ValueError(f"Buffer size ({view.nbytes} bytes) is not a multiple of {ITEMSIZE}")
+    return view.cast("B").cast("q")
+
+
+def _chunk_values(view: memoryview, start: int, stop: int, byteswap: bool
+                  ) -> Union[memoryview, array.array]:
+    if not byteswap:
+        return view[start:stop]
+    # only the current chunk is copied so that it can be swapped
+    values = array.array("q", view[start:stop])
+    values.byteswap()
+    return values
+
+
+def write_formatted(countdown: "Countdown", view: memoryview, sink: typing.IO, unit: str,
+                    ignore: bool, chunksize: int, little_endian: bool, encoding: str) -> int:
+    """Format every value in `view` and write them to `sink` (a text or binary file-like object),
+    one per line, `chunksize` values per write. Returns the number of values written.
+    
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    binary = not isinstance(sink, io.TextIOBase)
+    byteswap = little_endian and sys.byteorder != "little"
+    write = sink.write
+    total = len(view)
+    for start in range(0, total, chunksize):
+        values = _chunk_values(view, start, min(start + chunksize, total), byteswap)
+        text = "\n".join(countdown.iformat(values, unit=unit, ignore=ignore))
+        text += "\n"
+        write(text.encode(encoding) if binary else text)
+    return total
+
+
+def write_into(buf: Union[bytearray, memoryview, typing.Any], offset: int, data: bytes) -> int:
+    """Copy `data` into `buf` at `offset` and return the offset just past it. A `bytearray` is
+    grown if needed; any other writable buffer must already be large enough.
+    
+    """
+    end = offset + len(data)
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    if isinstance(buf, bytearray):
+        if offset > len(buf):
+            raise ValueError(f"offset {offset} is past the end of the buffer ({len(buf)} bytes)")
+        buf[offset:end] = data
+        return end
+    with memoryview(buf) as view:
+        if view.readonly:
+            raise TypeError("Buffer is read-only")
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        if end > view.nbytes:
+            raise ValueError(f"Buffer too small: {end} bytes needed, {view.nbytes} available")
+        view[offset:end] = data
+    return end
+
+
+def encode_many(texts: list[str], encoding: str) -> tuple[bytes, list[int]]:
+    """Encode `texts` as one block of bytes and return it along with the encoded length of each
+    text. ASCII output (the common case) is encoded in a single call.
+    
+    """
+    joined = "".join(texts)
+    if joined.isascii() and encoding.lower().replace("_", "-") in ("utf-8", "utf8", "ascii"):
+        return joined.encode("ascii"), [len(text) for text in texts]
+    encoded = [text.encode(encoding) for text in texts]
+    return b"".join(encoded), [len(data) for data in encoded]
@@ -0,0 +1,145 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import constants
+import itertools
+import datetime
+import typing
+
+if typing.TYPE_CHECKING:
+    from ._plan import RenderPlan
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# cumulative days before each month (index 1-12), for common and leap years
+_COMMON_DAYS_BEFORE_MONTH = (0, *itertools.accumulate(_DAYS_IN_MONTH[1:12], initial=0))
+_DAYS_BEFORE_MONTH = (
+    _COMMON_DAYS_BEFORE_MONTH,
+    tuple(days + (month > 2) for month, days in enumerate(_COMMON_DAYS_BEFORE_MONTH)),
+)
+# a datetime split into (year, month, day, ordinal, microseconds into the day)
+Split = tuple[int, int, int, int, int]
+
+
+def is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_in_month(year: int, month: int) -> int:
+    if month == 2 and is_leap(year):
+        return 29
+    return _DAYS_IN_MONTH[month]
+
+
+def ordinal(year: int, month: int, day: int) -> int:
+    """Same as `datetime.date(year, month, day).toordinal()`, without creating a date.
+    
+    """
+    y = year - 1
+    return y * 365 + y // 4 - y // 100 + y // 400 + _DAYS_BEFORE_MONTH[is_leap(year)][month] + day
+
+
+def split(dt: datetime.datetime) -> Split:
+    return (dt.year, dt.month, dt.day, dt.toordinal(),
+            ((dt.hour * 60 + dt.minute) * 60 + dt.second) * 1_000_000 + dt.microsecond)
+
+
+def difference(start: Split, end: Split, years: bool, months: bool,
+               max_value: Union[int, None] = None) -> tuple[int, int, int]:
+    """Return the calendar difference `(years, months, microseconds)` from `start` to `end`
+    (which must not be before `start`). Adding a month keeps the day of the month, clamped to
+    the length of the target month (so one month after January 31st is the end of February).
+    Only the fields that are requested are used (e.g. with `years` only, whole years are taken
+    and the rest is left in the microseconds). `max_value` clamps the years and months, with the
+    excess also left in the microseconds.
+    
+    """
+    sy, sm, sd, _, stod = start
+    ey, em, ed, eord, etod = end
+    total = (ey - sy) * 12 + em - sm
+    # if the anchor in the end month is after the end, the last month is not complete
+    if total and (min(sd, days_in_month(ey, em)), stod) > (ed, etod):
+        total -= 1
+    y = total // 12 if years else 0
+    if max_value and y > max_value:
+        y = max_value
+    m = total - y * 12 if months else 0
+    if max_value and m > max_value:
+        m = max_value
+    ay, am = divmod(sm - 1 + y * 12 + m, 12)
+    ay += sy
+    am += 1
+    aord = ordinal(ay, am, min(sd, days_in_month(ay, am)))
+    return y, m, (eord - aord) * constants.MICROSECONDS_IN_DAY + etod - stod
+
+
+def render(plan: "RenderPlan", start: Split, end: Split, z_flag: typing.Literal[1, -1],
+           ignore: bool = False) -> str:
+    """Render `plan` with calendar-accurate years and months between `start` and `end`; the
+    remainder is split over the other units as usual.
+    
+    """
+    units = plan.units
+    names = [unit.name for unit in units]
+    max_value = plan.max_value
+    years, months, remaining = difference(start, end, "y" in names, "M" in names, max_value)
+    remaining *= plan.scale
+    values: list[int] = []
+    for unit in units:
+        if unit.name == "y":
+            values.append(years)
+            continue
+        if unit.name == "M":
+            values.append(months)
+            continue
+        value, remaining = divmod(remaining, unit.divisor)
+        if max_value and value > max_value:
+            remaining += (value - max_value) * unit.divisor
+            value = max_value
+        values.append(value)
+    return plan.render_values(z_flag, values, ignore)
+
+
+def render_between(plan: "RenderPlan", reference: datetime.datetime,
+                   others: typing.Iterable[datetime.datetime], ignore: bool = False,
+                   since: bool = False) -> typing.Iterator[str]:
+    """Render `plan` for `other - reference` (or `reference - other` if `since` is `True`) for
+    each datetime in `others`, splitting `reference` once. Aware datetimes are converted to the
+    timezone of `reference`, and the calendar fields are computed on its wall clock. Like
+    subtraction, mixing naive and aware datetimes raises `TypeError`.
+    
+    """
+    ref = split(reference)
+    tzinfo = reference.tzinfo
+    z_flag: typing.Literal[1, -1] = -1 if since else 1
+    for other in others:
+        if (other.tzinfo is None) != (tzinfo is None):
+            raise TypeError("can't compare offset-naive and offset-aware datetimes")
+        if tzinfo is not None:
+            other = other.astimezone(tzinfo)
+        end = split(other)
+        if (end[3], end[4]) >= (ref[3], ref[4]):
+            yield render(plan, ref, end, z_flag, ignore)
+        else:
+            yield render(plan, end, ref, -z_flag, ignore)
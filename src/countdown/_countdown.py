@@ -26,23 +26,30 @@ from typing import Union
 from . import exceptions
 from . import formatter
 from . import constants
+from . import instrumentation
+from . import _plan
 from . import models
 from . import types
 from . import utils
+import itertools
 import datetime
-import plogging
-import logging
 import typing
-import re
+import array
+import os
+
+if typing.TYPE_CHECKING:
+    import numpy
+    from . import _ticker
 
 
 class Countdown:
     """The main class used to format and parse countdown strings.
 
     """
-    _log = plogging.setup_new("Countdown", level=logging.INFO, package=__name__)
+    _log = utils.LazyLogger("Countdown", package=__name__)
     def __init__(self, fmt: types.SupportsBracketFormat, remove_empty: bool = True,
-                 max_value: int = None, strip_output: bool = True,
+                 max_value: int = None, strip_output: bool = True, cache_size: int = None,
+                 instrument: Union[bool, instrumentation.Instrumentation] = False,
                  **defaults: Union[typing.Callable[[models.TimeValue], typing.Any], typing.Any]
                  ) -> None:
         """
@@ -56,25 +63,111 @@ class Countdown:
             If given a value, the maximum number for each flag will be the given value.
         strip_output : bool, default=True
             If `True`, `str.strip()` will be run on the output before being returned.
+        cache_size : int, default=None
+            If given a value, up to this many formatted strings will be kept in an LRU cache,
+            keyed on the input quantized to the smallest unit in the format string. The cache is
+            not used if any default is callable, unless every callable default declares the
+            flags it depends on with `models.depends_on`. See `.cache_info`.
+        instrument : bool or Instrumentation, default=False
+            If `True` or an `Instrumentation` instance, calls to `.format` and `.parse` are timed
+            and counted, as is obtaining the compiled template (recorded as `update_fmt`). Batch
+            methods (`.iformat`, `.format_many`, `.parse_many`, etc.) record each item as one
+            `format` or `parse` call. Work done in worker processes by `.format_parallel` and
+            `.parse_parallel` and calendar formatting are not recorded. See `.instrumentation`.
         **defaults : Any
-            Default values for the fields in `fmt`.
+            Default values for the fields in `fmt`. Callable defaults (functions, builtins,
+            bound methods, `functools.partial` objects, etc.) are called with the `TimeValue`
+            being formatted; use `models.depends_on` to memoize them.
+
+        Notes
+        -----
+        The compiled template (`.flags`, `.fmt` and `.plan`) is interned process-wide, keyed on
+        `fmt`, the options and `defaults` (if they are all strings, integers, booleans, `None`
+        or callables), so instances created with the same arguments share it and only the first
+        construction runs `formatter.update_fmt`.
+
+        Instances are safe to share between threads. The compiled template is immutable once
+        built, the render cache is lock-striped (see `_plan.RenderCache`), and the parsers built
+        lazily by `.compile_parser` only depend on the template, so a race between two threads
+        at most builds one twice.
         
         """
-        Countdown._log.debug(f"Updating format string: '{fmt}'")
+        if cache_size is not None and cache_size < 0:
+            raise ValueError(f"cache_size must not be negative, got {cache_size}")
+        Countdown._log.debug("Updating format string: '%s'", fmt)
         self.__ofmt = fmt
-        self.__flags, self.__fmt = formatter.update_fmt(fmt)
+        self.__instrumentation: Union[instrumentation.Instrumentation, None] = None
+        get_template = _plan.get_template
+        if instrument:
+            if not isinstance(instrument, instrumentation.Instrumentation):
+                instrument = instrumentation.Instrumentation()
+            self.__instrumentation = instrument
+            get_template = instrument.wrap("update_fmt", get_template)
+        self.__flags, self.__fmt, self.__plan = get_template(fmt, defaults, remove_empty,
+                                                             max_value, strip_output)
         self._remove_empty = remove_empty
         self._max_value = max_value
         self._strip_output = strip_output
         self._defaults = defaults
+        self._cache_size = cache_size
+        # format strings with an `{n}` field are rendered from nanoseconds rather than
+        # microseconds; `__scale` is the number of those units per microsecond
+        self.__scale = 1
+        self.__unit_map = constants.MAP
+        if "n" in self.__flags:
+            self.__scale = constants.NANOSECONDS_IN_MICROSECOND
+            self.__unit_map = constants.NS_MAP
+        # the static and callable extras of each flag, classified once for `_format_uncompiled`;
+        # flags with a missing default are left out, so that formatting raises as usual
+        self.__extras: dict[str, tuple[dict[str, typing.Any], dict[str, typing.Callable]]] = {}
+        for flag in self.__flags:
+            try:
+                self.__extras[flag.name] = flag.get_extras(defaults)
+            except KeyError:
+                pass
+        self.__cache: Union[_plan.RenderCache, None] = None
+        # callable defaults can only be cached through if they declare what they depend on
+        if cache_size and self.__plan is not None and all(
+                isinstance(func, models.MemoizedDefault)
+                for unit in self.__plan.units for func, _ in unit.funcs):
+            self.__cache = _plan.RenderCache(self.__plan, cache_size)
+        self.__parse_info: Union[formatter.ParseInfo, None] = None
+        self.__strict_parser: Union[_plan.StrictParser, None] = None
+        if self.__instrumentation is not None:
+            self.__instrumentation._cache_info = self.cache_info
+            self.format = self.__instrumentation.wrap("format", self.format)
+            self.parse = self.__instrumentation.wrap("parse", self.parse, (exceptions.ParseError,))
     
+    def __reduce__(self) -> tuple[typing.Callable[..., "Countdown"], tuple]:
+        # pickled as the constructor arguments; the compiled template is rebuilt (or fetched
+        # from the intern cache) on unpickling. Instrumentation is not carried over. Callable
+        # defaults must be picklable, i.e. defined at module level.
+        return _restore, (self.__ofmt, self._remove_empty, self._max_value, self._strip_output,
+                          self._cache_size, self._defaults)
+
     @property
-    def flags(self) -> formatter.Flags:
-        """The `Flags` object that has been constructed from the given format string.
+    def flags(self) -> formatter.FlagSet:
+        """The frozen `FlagSet` that has been constructed from the given format string.
         
         """
         return self.__flags
     
+    @property
+    def plan(self) -> Union[_plan.RenderPlan, None]:
+        """The `RenderPlan` compiled from the updated format string, or `None` if the format string
+        could not be compiled (in which case `str.format` is used directly).
+        
+        """
+        return self.__plan
+
+    @property
+    def instrumentation(self) -> Union[instrumentation.Instrumentation, None]:
+        """The `Instrumentation` collecting metrics for this instance, or `None` if the instance
+        was not created with `instrument`.
+        
+        """
+        return self.__instrumentation
+
     @property
     def orig_fmt(self) -> str:
         """The original format string.
@@ -89,36 +182,67 @@ class Countdown:
         """
         return self.__fmt
     
-    @utils.StaticProperty
+    @utils.CachedStaticProperty
     def default() -> "Countdown":
-        """Create and return the default `Countdown` instance.
+        """The default `Countdown` instance (created on first access).
         
         """
         Countdown._log.debug("Creating default formatter")
         return Countdown("{y}{yd}{M}{Md}{w}{wd}{d}{dd}{h}{hd}{m}{md}{S}{Sd}", yd="y ", Md="mo ",
                          wd="w ", dd="d ", hd="h ", md="m ", Sd="s")
 
-    def parse(self, parsable: str) -> models.TimeValue:
+    @typing.overload
+    def compile_parser(self, strict: typing.Literal[False] = False) -> formatter.ParseInfo: ...
+    @typing.overload
+    def compile_parser(self, strict: typing.Literal[True]) -> _plan.StrictParser: ...
+    def compile_parser(self, strict: bool = False):
+        """Build (or fetch from the shared cache) the compiled parse patterns used by `.parse`.
+        This is done lazily on the first call to `.parse`, but may be called ahead of time to
+        pre-warm the instance. If `strict` is `True`, the `StrictParser` used by
+        `.parse(..., strict=True)` is built instead.
+        
+        """
+        if strict:
+            strict_parser = self.__strict_parser
+            if strict_parser is None:
+                if self.__plan is None:
+                    raise exceptions.ParseError("Strict parsing requires a format string that "
+                                                "can be compiled into a RenderPlan")
+                strict_parser = _plan.compile_strict_parser(self.__plan)
+                self.__strict_parser = strict_parser
+            return strict_parser
+
+        parse_info = self.__parse_info
+        if parse_info is None:
+            parse_info = formatter.get_parse_info(self.__ofmt, self.__flags, self._defaults)
+            self.__parse_info = parse_info
+        return parse_info
+
+    def parse(self, parsable: str, *, strict: bool = False) -> models.TimeValue:
         """Attempt to parse `parsable` string into a new `TimeValue` object.
+
+        If `strict` is `True`, `parsable` must match the whole format string (as output by
+        `.format`); it is then parsed with a single anchored regex rather than searching for each
+        flag separately. Units that are absent due to `remove_empty` are set to 0.
         
         """
+        if strict:
+            return self.compile_parser(True).parse(parsable)
+        return self._parse_with(parsable, self.compile_parser())
+
+    @staticmethod
+    def _iter_parsed(parsable: str, parse_info: formatter.ParseInfo
+                     ) -> typing.Iterator[tuple[str, int]]:
         def get_int(__str: str) -> int:
             if __str == "+":
                 return 1
             if __str == "-":
                 return -1
             return int(__str)
-        
-        # prepare parsing info
-        parse_info = [(flag.name, flag.get_parse_info(self._defaults)) if flag.name != "z" else
-                      (flag.name, flag.get_parse_info(self._defaults, "(-|\\+)"))
-                      for flag in self.__flags]
-        parse_info.sort(key=lambda a: a[1][1], reverse=True)
-        tval = models.TimeValue()
 
         # start searching through the parsable str
-        for flag_name, (pat, _) in parse_info:
-            matches = list(re.finditer(pat, parsable))
+        for flag_name, pat, _ in parse_info:
+            matches = list(pat.finditer(parsable))
             num_matches = len(matches)
             if num_matches == 0:
                 continue
@@ -128,21 +252,159 @@ class Countdown:
                     msg = "', '".join(m.group(0) for m in matches)
                     raise exceptions.ParseError(f"Multiple matches found for flag '{flag_name}': "
                                                 f"'{msg}'")
-            tval.set(flag_name, get_int(matches[0].group(1)))
+            yield flag_name, get_int(matches[0].group(1))
 
             # we remove the match in the string afterwards so later
             # matches have a better chance of succeeding
-            parsable = re.sub(pat, "", parsable)
-        
+            parsable = pat.sub("", parsable)
+
+    @staticmethod
+    def _parse_with(parsable: str, parse_info: formatter.ParseInfo) -> models.TimeValue:
+        tval = models.TimeValue()
+        for flag_name, value in Countdown._iter_parsed(parsable, parse_info):
+            tval.set(flag_name, value)
         return tval
 
+    @staticmethod
+    def _parse_total_with(parsable: str, parse_info: formatter.ParseInfo) -> int:
+        total = 0
+        z_flag = 1
+        for flag_name, value in Countdown._iter_parsed(parsable, parse_info):
+            if flag_name == "z":
+                z_flag = value
+            else:
+                total += value * constants.NS_MAP[flag_name]
+        return total // constants.NANOSECONDS_IN_MICROSECOND * z_flag
+
+    def parse_many(self, lines: typing.Iterable[Union[str, bytes]], *, strict: bool = False,
+                   as_int: bool = False,
+                   errors: typing.Literal["raise", "skip", "sentinel"] = "raise",
+                   sentinel: typing.Any = None
+                   ) -> typing.Iterator[Union[models.TimeValue, int, typing.Any]]:
+        """Lazily parse each line in `lines` (any iterable of strings, such as an open file).
+        Trailing newlines are removed, and `bytes` lines are decoded as UTF-8. The parse patterns
+        are compiled once and shared by all lines.
+
+        Arguments
+        ---------
+        lines : Iterable[str | bytes]
+            The strings to parse.
+        strict : bool, default=False
+            Same as in `.parse`.
+        as_int : bool, default=False
+            If `True`, the total number of microseconds is yielded for each line instead of a
+            `TimeValue` object.
+        errors : "raise" | "skip" | "sentinel", default="raise"
+            What to do when a line fails to parse (raises `exceptions.ParseError`): re-raise the
+            error, skip the line, or yield `sentinel` in its place.
+        sentinel : Any, default=None
+            The value yielded for lines that fail to parse if `errors="sentinel"`.
+        
+        """
+        if errors not in ("raise", "skip", "sentinel"):
+            raise ValueError(f"Invalid error policy: '{errors}'")
+        if strict:
+            strict_parser = self.compile_parser(True)
+            parse = strict_parser.parse_total if as_int else strict_parser.parse
+        else:
+            parse_info = self.compile_parser()
+            parse_with = self._parse_total_with if as_int else self._parse_with
+            parse = lambda parsable: parse_with(parsable, parse_info)
+        if self.__instrumentation is not None:
+            parse = self.__instrumentation.wrap("parse", parse, (exceptions.ParseError,))
+
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode()
+            line = line.rstrip("\r\n")
+            try:
+                yield parse(line)
+            except exceptions.ParseError:
+                if errors == "raise":
+                    raise
+                if errors == "sentinel":
+                    yield sentinel
+
+    def parse_parallel(self, lines: typing.Iterable[Union[str, bytes]], *, workers: int = None,
+                       chunksize: int = 10_000, strict: bool = False, as_int: bool = False,
+                       errors: typing.Literal["raise", "skip", "sentinel"] = "raise",
+                       sentinel: typing.Any = None, mp_context: typing.Any = None
+                       ) -> typing.Iterator[Union[models.TimeValue, int, typing.Any]]:
+        """Same as `.parse_many`, but chunks of `chunksize` lines are parsed in a pool of
+        `workers` processes (defaults to `os.cpu_count()`). Results are yielded in order, and
+        `lines` is consumed lazily. See `.format_parallel`.
+        
+        """
+        if errors not in ("raise", "skip", "sentinel"):
+            raise ValueError(f"Invalid error policy: '{errors}'")
+        from . import _parallel
+        # workers put a picklable marker in place of `sentinel`, swapped back in below so that
+        # `result is sentinel` holds
+        kwargs = dict(strict=strict, as_int=as_int, errors=errors, sentinel=_parallel.FAILED)
+        results = _parallel.run_chunks(self, _parallel.parse_chunk, (kwargs,), lines, workers,
+                                       chunksize, mp_context)
+        if errors != "sentinel":
+            return results
+        failed = _parallel.FAILED
+        return (sentinel if result is failed else result for result in results)
 
     def format(self, microseconds: Union[int, float], *, ignore: bool = False) -> str:
         """The core method for formatting the format string with the given microseconds. All other
         format methods in `Countdown` convert to microseconds, then call this method.
         
         """
-        Countdown._log.debug(f"Formatting format string from microseconds: {microseconds}")
+        if self.__scale != 1:
+            microseconds *= self.__scale
+        return self._render(microseconds, ignore)
+
+    def format_ns(self, nanoseconds: int, *, ignore: bool = False) -> str:
+        """Format the format string given integer nanoseconds (e.g. from `time.perf_counter_ns`).
+        If the format string contains `{n}`, the value is used exactly; otherwise it is truncated
+        to microseconds (toward 0, like `.format`) using integer arithmetic.
+        
+        """
+        if self.__scale == 1:
+            if nanoseconds >= 0:
+                nanoseconds //= constants.NANOSECONDS_IN_MICROSECOND
+            else:
+                # keep the sign of values between -1 and 0 microseconds, like `.format` does
+                nanoseconds = (-(-nanoseconds // constants.NANOSECONDS_IN_MICROSECOND) or
+                               nanoseconds / constants.NANOSECONDS_IN_MICROSECOND)
+        return self._render(nanoseconds, ignore)
+
+    def _render(self, value: Union[int, float], ignore: bool = False) -> str:
+        # `value` is in microseconds, or nanoseconds if the format string contains `{n}`
+        plan = self.__plan
+        if plan is None:
+            return self._format_uncompiled(value, ignore=ignore)
+        cache = self.__cache
+        if cache is not None:
+            return cache.render(value, ignore)
+        return plan.render(value, ignore)
+
+    def cache_info(self) -> Union[_plan.CacheInfo, None]:
+        """Return the hits, misses, maximum size and current size of the render cache, or `None`
+        if this instance does not use a render cache.
+        
+        """
+        if self.__cache is None:
+            return None
+        return self.__cache.info()
+
+    def cache_clear(self) -> None:
+        """Clear the render cache and reset its statistics.
+        
+        """
+        if self.__cache is not None:
+            self.__cache.clear()
+
+    def _format_uncompiled(self, microseconds: Union[int, float], *, ignore: bool = False) -> str:
+        """Format by building the keyword arguments for `str.format` from scratch. Used when the
+        format string could not be compiled into a `RenderPlan`. `microseconds` is in nanoseconds
+        if the format string contains `{n}`.
+        
+        """
+        Countdown._log.debug("Formatting format string from microseconds: %s", microseconds)
         z_flag = 1 if microseconds >= 0 else -1
         remaining = abs(int(microseconds))
 
@@ -152,8 +414,8 @@ class Countdown:
         # these will be run later
         funcs: dict[str, typing.Callable[[models.TimeValue], typing.Any]] = dict()
 
-        # if the flag name is present in our Flags instance, then convert; otherwise, move on
-        for flag_name, div in constants.MAP.items():
+        # if the flag name is present in our FlagSet, then convert; otherwise, move on
+        for flag_name, div in self.__unit_map.items():
             flag: formatter.Flag = self.__flags.get(flag_name, None)
             if not flag:
                 continue
@@ -170,7 +432,8 @@ class Countdown:
 
             fmt_kwargs[flag_name] = value
 
-            extra_kwargs, extra_funcs = flag.get_extras(self._defaults)
+            extras = self.__extras.get(flag_name)
+            extra_kwargs, extra_funcs = extras or flag.get_extras(self._defaults)
             fmt_kwargs.update(extra_kwargs)
             funcs.update(extra_funcs)
 
@@ -193,6 +456,213 @@ class Countdown:
             return formatted.strip()
         return formatted
 
+    def iformat(self, iterable: typing.Iterable[Union[int, float, datetime.timedelta]], *,
+                unit: str = "microseconds", ignore: bool = False) -> typing.Iterator[str]:
+        """Lazily format each value in `iterable`. Values are interpreted as a number of `unit`
+        (one of the keys of `constants.MICROSECONDS_IN_UNIT`), unless they are
+        `datetime.timedelta` instances. `ignore` has the same meaning as in `.format`.
+        
+        """
+        try:
+            multiplier = constants.MICROSECONDS_IN_UNIT[unit]
+        except KeyError as exc:
+            raise ValueError(f"Invalid unit: '{unit}'") from exc
+        scale = self.__scale
+        multiplier *= scale
+        plan = self.__plan
+        if plan is None:
+            render = lambda microseconds, ignore: self._format_uncompiled(microseconds,
+                                                                          ignore=ignore)
+        elif self.__cache is not None:
+            render = self.__cache.render
+        else:
+            render = plan.render
+        if self.__instrumentation is not None:
+            render = self.__instrumentation.wrap("format", render)
+        timedelta = datetime.timedelta
+        timedelta_to_microseconds = utils.timedelta_to_microseconds
+        for value in iterable:
+            if isinstance(value, timedelta):
+                value = timedelta_to_microseconds(value) * scale
+            elif multiplier != 1:
+                value *= multiplier
+            yield render(value, ignore)
+
+    def format_many(self, iterable: typing.Iterable[Union[int, float, datetime.timedelta]], *,
+                    unit: str = "microseconds", ignore: bool = False) -> list[str]:
+        """Same as `.iformat`, but returns a list.
+        
+        """
+        return list(self.iformat(iterable, unit=unit, ignore=ignore))
+
+    def format_parallel(self, iterable: typing.Iterable[Union[int, float, datetime.timedelta]], *,
+                        workers: int = None, chunksize: int = 10_000, unit: str = "microseconds",
+                        ignore: bool = False, mp_context: typing.Any = None
+                        ) -> typing.Iterator[str]:
+        """Same as `.iformat`, but chunks of `chunksize` values are formatted in a pool of
+        `workers` processes (defaults to `os.cpu_count()`). Results are yielded in order as they
+        become available, and `iterable` is consumed lazily. This instance is pickled once per
+        worker, so any callable defaults must be defined at module level. With `workers=1`, the
+        values are formatted in the current process.
+        
+        """
+        if unit not in constants.MICROSECONDS_IN_UNIT:
+            raise ValueError(f"Invalid unit: '{unit}'")
+        from . import _parallel
+        return _parallel.run_chunks(self, _parallel.format_chunk, (unit, ignore), iterable,
+                                    workers, chunksize, mp_context)
+
+    def format_into(self, microseconds: Union[int, float], buf: Union[bytearray, memoryview],
+                    offset: int = 0, *, ignore: bool = False, encoding: str = "utf-8") -> int:
+        """Format `microseconds` and write the encoded result into `buf` at `offset`, returning
+        the number of bytes written. A `bytearray` is grown if the result does not fit; any other
+        writable buffer (e.g. a `memoryview`) must be large enough, or `ValueError` is raised.
+
+        This is a convenience for assembling output in a preallocated buffer: the result is still
+        formatted as a `str`, encoded and then copied, so it does not save any allocation over
+        `.format(...).encode()`. To fill a buffer with many results, use `.format_many_into`.
+        
+        """
+        from . import _buffer
+        data = self.format(microseconds, ignore=ignore).encode(encoding)
+        return _buffer.write_into(buf, offset, data) - offset
+
+    def format_many_into(self, iterable: typing.Iterable[Union[int, float, datetime.timedelta]],
+                         buf: Union[bytearray, memoryview], offset: int = 0, *,
+                         unit: str = "microseconds", ignore: bool = False,
+                         encoding: str = "utf-8") -> array.array:
+        """Format every value in `iterable` (see `.iformat`) and pack the encoded results back to
+        back into `buf`, starting at `offset`. Returns an `array.array('q')` of `n + 1` offsets,
+        where result `i` occupies `buf[offsets[i]:offsets[i + 1]]`. Results are encoded and
+        copied in chunks, with one write into `buf` per chunk. The same sizing rules apply as for
+        `.format_into`.
+        
+        """
+        from . import _buffer
+        offsets = array.array("q", [offset])
+        iterator = self.iformat(iterable, unit=unit, ignore=ignore)
+        while True:
+            texts = list(itertools.islice(iterator, constants.CHUNK_SIZE))
+            if not texts:
+                return offsets
+            data, lengths = _buffer.encode_many(texts, encoding)
+            start = offsets[-1]
+            _buffer.write_into(buf, start, data)
+            offsets.extend(itertools.islice(itertools.accumulate(lengths, initial=start), 1, None))
+
+    def format_buffer(self, buf: typing.Any, sink: typing.IO, *, unit: str = "microseconds",
+                      ignore: bool = False, chunksize: int = constants.CHUNK_SIZE,
+                      little_endian: bool = True, encoding: str = "utf-8") -> int:
+        """Format every int64 value in `buf` (any buffer-protocol object, such as
+        `array.array('q')`, a `memoryview`, `bytes` or an `mmap`) and write the results to `sink`
+        (a text or binary file-like object), one per line. Values are read straight from the
+        buffer and written `chunksize` lines at a time, so memory use does not grow with the
+        size of `buf`. Byte buffers are read as little-endian int64 unless `little_endian` is
+        `False`, in which case they are read in native byte order; typed buffers other than int64
+        (e.g. `array('d')`) raise `TypeError`. Returns the number of values written.
+        
+        """
+        from . import _buffer
+        with _buffer.int64_view(buf) as view:
+            swap = little_endian and _buffer.is_raw(buf)
+            return _buffer.write_formatted(self, view, sink, unit, ignore, chunksize, swap,
+                                           encoding)
+
+    def format_file(self, path: Union[str, "os.PathLike[str]"], sink: typing.IO, *,
+                    unit: str = "microseconds", ignore: bool = False,
+                    chunksize: int = constants.CHUNK_SIZE, little_endian: bool = True,
+                    encoding: str = "utf-8") -> int:
+        """Same as `.format_buffer`, but the values are read from a raw int64 file at `path`,
+        which is memory-mapped rather than read into memory.
+        
+        """
+        import mmap
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return self.format_buffer(mapped, sink, unit=unit, ignore=ignore,
+                                          chunksize=chunksize, little_endian=little_endian,
+                                          encoding=encoding)
+
+    def next_change(self, microseconds: int) -> Union[int, None]:
+        """Return the number of microseconds until `.format` would produce a different string,
+        assuming `microseconds` keeps decreasing as time passes (as it does for a countdown; past
+        0 the sign flips and the magnitude grows). This accounts for the smallest unit in the
+        format string, units disappearing due to `remove_empty`, `max_value` clamping, and
+        plural flips. `None` is returned if the output will never change.
+        
+        """
+        plan = self.__plan
+        if plan is None:
+            units = [(div, True) for name, div in self.__unit_map.items() if name in self.__flags]
+        else:
+            # a callable default is passed the whole `TimeValue`, so it can change when any unit
+            # does, unless it declares the flags it reads with `models.depends_on`
+            read: set[str] = set()
+            for unit in plan.units:
+                for func, _ in unit.funcs:
+                    if not isinstance(func, models.MemoizedDefault):
+                        read.update(self.__unit_map)
+                        break
+                    read.update(func.flags)
+            units = [(unit.divisor, bool(unit.values or unit.funcs) or unit.name in read)
+                     for unit in plan.units]
+        scale = self.__scale
+        delta = _plan.next_change(units, self._max_value, int(microseconds * scale), self._render)
+        if delta is None or scale == 1:
+            return delta
+        return -(-delta // scale)
+
+    def ticker(self, target: Union[datetime.datetime, int, float],
+               step: Union[int, datetime.timedelta] = None, *, ignore: bool = False
+               ) -> "_ticker.Ticker":
+        """Return a `Ticker` that renders a live countdown to `target` (a datetime, or seconds
+        since the epoch) every `step` (microseconds or a timedelta; defaults to the smallest unit
+        in the format string). The ticker can be used with both `for` and `async for`; sleeps are
+        aligned so that each tick lands when the remaining time is a multiple of `step`, and each
+        tick only re-renders the units whose value changed.
+
+        Example Usage
+        -------------
+        ```
+        >>> for text in Countdown.default.ticker(deadline):
+        >>>     print(text, end="\r")
+        ```
+        
+        """
+        from . import _ticker
+        return _ticker.Ticker(self, target, step, ignore)
+
+    def decompose_array(self, arr: "numpy.typing.ArrayLike") -> dict[str, "numpy.ndarray"]:
+        """Vectorized version of the unit cascade run by `.format`. Takes an array of microseconds
+        and returns a dict mapping `z` (the sign, as 1 or -1) and each base flag present in the
+        format string to an integer array of the same shape. Requires NumPy.
+        
+        """
+        from . import _numpy
+        units = [(name, div) for name, div in self.__unit_map.items() if name in self.__flags]
+        if self.__scale != 1:
+            arr = _numpy.import_numpy().asarray(arr) * self.__scale
+        return _numpy.decompose_array(units, self._max_value, arr)
+
+    def format_array(self, arr: "numpy.typing.ArrayLike", *, ignore: bool = False
+                     ) -> "numpy.ndarray":
+        """Format an array of microseconds, returning an array of strings of the same shape. The
+        strings are built column-wise from the output of `.decompose_array`. Requires NumPy.
+        
+        """
+        from . import _numpy
+        np = _numpy.import_numpy()
+        plan = self.__plan
+        if plan is None:
+            arr = np.asarray(arr)
+            return np.array([self.format(v, ignore=ignore) for v in arr.ravel().tolist()],
+                            dtype=str).reshape(arr.shape)
+        if self.__scale != 1:
+            arr = np.asarray(arr) * self.__scale
+        return _numpy.format_array(plan, arr, ignore)
+
     def format_time(self, weeks: Union[int, float] = None, days: Union[int, float] = None,
                     hours: Union[int, float] = None, minutes: Union[int, float] = None,
                     seconds: Union[int, float] = None, milliseconds: Union[int, float] = None,
@@ -206,11 +676,12 @@ class Countdown:
                                                         milliseconds=milliseconds or 0,
                                                         microseconds=microseconds or 0))
 
-    def format_microseconds(self, microseconds: Union[int, float]) -> str:
-        """An alias for `.format`.
+    def format_microseconds(self, microseconds: Union[int, float], *, ignore: bool = False
+                            ) -> str:
+        """Same as `.format`. Calls go through `.format`, so they are instrumented like it.
         
         """
-    format_microseconds = format
+        return self.format(microseconds, ignore=ignore)
 
     def format_milliseconds(self, milliseconds: Union[int, float]) -> str:
         """Format the format string given a number of seconds.
@@ -252,16 +723,62 @@ class Countdown:
         """Format the format string given a datetime.timedelta instance.
         
         """
-        return self.format(td.total_seconds() * constants.MICROSECONDS_IN_SECOND)
+        return self.format(utils.timedelta_to_microseconds(td))
 
-    def format_datetime(self, dt: datetime.datetime, dt2: datetime.datetime = None) -> str:
+    def format_datetime(self, dt: datetime.datetime, dt2: datetime.datetime = None, *,
+                        calendar: bool = False, ignore: bool = False) -> str:
         """Format the format string given a datetime object and an optional second datetime
         object. If the second datetime object is not provided, a new one will be created with the
         current time. The timedelta is acquired from `dt2 - dt`.
+
+        If `calendar` is `True`, years and months are real calendar years and months (e.g. from
+        January 15th to March 15th is exactly 2 months) rather than multiples of 360 and 30 days;
+        the remainder is split over the other units as usual.
         
         """
         if dt2 is None:
             dt2 = datetime.datetime.now(tz=dt.tzinfo)
+        if calendar:
+            from . import _calendar
+            return next(_calendar.render_between(self.__calendar_plan(), dt, (dt2,), ignore))
         td = dt2 - dt
         return self.format_timedelta(td)
 
+    def format_datetimes(self, datetimes: typing.Iterable[datetime.datetime],
+                         reference: datetime.datetime = None, *, calendar: bool = False,
+                         ignore: bool = False) -> list[str]:
+        """Batch version of `.format_datetime`: format `reference - dt` for each `dt` in
+        `datetimes`, i.e. `.format_datetime(dt, reference)` (e.g. many start times against the
+        current time, which is the default `reference`, in the timezone of the first datetime like
+        `.format_datetime`). In calendar mode, `reference` is only split into its calendar fields
+        once and the calendar fields are computed on its wall clock. Mixing naive and aware
+        datetimes raises `TypeError`.
+        
+        """
+        if reference is None:
+            datetimes = iter(datetimes)
+            try:
+                first = next(datetimes)
+            except StopIteration:
+                return []
+            reference = datetime.datetime.now(tz=first.tzinfo)
+            datetimes = itertools.chain((first,), datetimes)
+        if calendar:
+            from . import _calendar
+            return list(_calendar.render_between(self.__calendar_plan(), reference, datetimes,
+                                                 ignore, since=True))
+        timedelta_to_microseconds = utils.timedelta_to_microseconds
+        return self.format_many((timedelta_to_microseconds(reference - dt) for dt in datetimes),
+                                ignore=ignore)
+
+    def __calendar_plan(self) -> _plan.RenderPlan:
+        if self.__plan is None:
+            raise ValueError("Calendar formatting requires a format string that can be compiled "
+                             "(see `.plan`)")
+        return self.__plan
+
+
+def _restore(fmt: types.SupportsBracketFormat, remove_empty: bool, max_value: Union[int, None],
+             strip_output: bool, cache_size: Union[int, None], defaults: dict[str, typing.Any]
+             ) -> Countdown:
+    return Countdown(fmt, remove_empty, max_value, strip_output, cache_size, **defaults)
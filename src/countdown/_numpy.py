@@ -0,0 +1,125 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import _plan
+import functools
+import operator
+import typing
+
+if typing.TYPE_CHECKING:
+    import numpy
+
+
+def import_numpy():
+    """Import and return `numpy`, raising a helpful `ImportError` if it is not installed.
+    
+    """
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError("NumPy is required for array formatting; install it with "
+                          "`pip install countdown[numpy]`") from exc
+    return numpy
+
+
+def decompose_array(units: typing.Sequence[tuple[str, int]], max_value: Union[int, None],
+                    arr: "numpy.typing.ArrayLike") -> dict[str, "numpy.ndarray"]:
+    """Run the unit cascade over an array of microseconds. Returns a dict mapping `z` and each
+    unit name to an array of the same shape as `arr`.
+    
+    """
+    np = import_numpy()
+    arr = np.asarray(arr)
+    columns: dict[str, numpy.ndarray] = {"z": np.where(arr >= 0, 1, -1).astype(np.int8)}
+    if arr.dtype.kind == "f":
+        remaining = np.abs(np.trunc(arr)).astype(np.int64)
+    else:
+        remaining = np.abs(arr.astype(np.int64))
+
+    for name, divisor in units:
+        value, remaining = np.divmod(remaining, divisor)
+        if max_value:
+            excess = value - max_value
+            clamped = excess > 0
+            if clamped.any():
+                remaining = remaining + np.where(clamped, excess, 0) * divisor
+                value = np.where(clamped, max_value, value)
+        columns[name] = value
+    return columns
+
+
+def format_array(plan: _plan.RenderPlan, arr: "numpy.typing.ArrayLike",
+                 ignore: bool = False) -> "numpy.ndarray":
+    """Format an array of microseconds with the given `RenderPlan`. Each piece of the plan is
+    built as a column of strings from the decomposed values, and the columns are then
+    concatenated.
+    
+    """
+    np = import_numpy()
+    arr = np.asarray(arr)
+    shape = arr.shape
+    columns = decompose_array([(unit.name, unit.divisor) for unit in plan.units], plan.max_value,
+                              arr.ravel())
+
+    if any(unit.funcs for unit in plan.units):
+        # callable defaults need a `TimeValue` per row
+        signs = columns["z"].tolist()
+        values = zip(*(columns[unit.name].tolist() for unit in plan.units))
+        result = np.array([plan.render_values(z_flag, row, ignore)
+                           for z_flag, row in zip(signs, values)], dtype=str)
+        return result.reshape(shape)
+
+    pieces: list[typing.Union[str, numpy.ndarray]] = list(plan.pieces)
+    for index, (plus, minus) in plan.z_slots:
+        pieces[index] = np.where(columns["z"] == 1, plus, minus).astype(object)
+
+    for unit in plan.units:
+        value = columns[unit.name]
+        empty = value == 0 if plan.remove_empty else np.zeros(value.shape, dtype=bool)
+        singular = value == 1
+        empty_text = dict(unit.empty)
+        for (index, singular_text), (_, plural_text) in zip(unit.singular, unit.plural):
+            pieces[index] = np.where(empty, empty_text[index],
+                                     np.where(singular, singular_text, plural_text)).astype(object)
+        for index, conversion, format_spec in unit.values:
+            if conversion is None and not format_spec:
+                text = value.astype(str)
+            else:
+                text = np.array([_plan._render_field(v, conversion, format_spec)
+                                 for v in value.tolist()], dtype=str)
+            pieces[index] = np.where(empty, empty_text[index], text).astype(object)
+
+    # merge runs of literal text so that each one is only concatenated once
+    merged: list[typing.Union[str, numpy.ndarray]] = [""]
+    for piece in pieces:
+        if isinstance(piece, str) and isinstance(merged[-1], str):
+            merged[-1] += piece
+        else:
+            merged.append(piece)
+    result = functools.reduce(operator.add, merged, np.full(arr.size, "", dtype=object))
+    result = result.astype(str)
+    if plan.strip_output:
+        result = np.char.strip(result)
+    return result.reshape(shape)
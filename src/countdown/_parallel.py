@@ -0,0 +1,123 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import types
+import collections
+import itertools
+import typing
+import os
+
+if typing.TYPE_CHECKING:
+    import concurrent.futures
+    from ._countdown import Countdown
+
+
+# the `Countdown` used by tasks in a worker process; set once per worker by `_init_worker`, so
+# that only the chunks (and not the countdown) are sent with each task
+_worker_countdown: Union["Countdown", None] = None
+
+
+def _init_worker(countdown: "Countdown") -> None:
+    global _worker_countdown
+    _worker_countdown = countdown
+
+
+class _Failed:
+    """Stand-in for the caller's sentinel in `parse_chunk` results. It is a singleton that pickles
+    by reference, so the parent process can swap the caller's (possibly unpicklable or
+    identity-compared) sentinel back in.
+    
+    """
+    __slots__ = ()
+    def __reduce__(self) -> str:
+        return "FAILED"
+
+    def __repr__(self) -> str:
+        return "<failed parse>"
+
+
+FAILED = _Failed()
+
+
+def format_chunk(chunk: list, unit: str, ignore: bool, countdown: "Countdown" = None
+                 ) -> list[str]:
+    return (countdown or _worker_countdown).format_many(chunk, unit=unit, ignore=ignore)
+
+
+def parse_chunk(chunk: list, kwargs: dict[str, typing.Any], countdown: "Countdown" = None
+                ) -> list:
+    return list((countdown or _worker_countdown).parse_many(chunk, **kwargs))
+
+
+def chunked(iterable: typing.Iterable[types.T], size: int) -> typing.Iterator[list[types.T]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunks(countdown: "Countdown", func: typing.Callable[..., list], args: tuple,
+               iterable: typing.Iterable, workers: Union[int, None], chunksize: int,
+               mp_context: typing.Any = None) -> typing.Iterator:
+    """Apply `func(chunk, *args)` (`format_chunk` or `parse_chunk`) to consecutive chunks of
+    `iterable` in a process pool whose workers each hold an unpickled copy of `countdown`, and
+    return an iterator over the results in order. At most two chunks per worker are in flight at
+    a time, so `iterable` is consumed lazily. `chunksize` and `workers` are validated before
+    returning.
+    
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    return _run_chunks(countdown, func, args, chunked(iterable, chunksize), workers, mp_context)
+
+
+def _run_chunks(countdown: "Countdown", func: typing.Callable[..., list], args: tuple,
+                chunks: typing.Iterator[list], workers: int, mp_context: typing.Any
+                ) -> typing.Iterator:
+    if workers == 1:
+        for chunk in chunks:
+            yield from func(chunk, *args, countdown)
+        return
+
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context, _init_worker,
+                                                (countdown,)) as executor:
+        pending: collections.deque[concurrent.futures.Future] = collections.deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(func, chunk, *args))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,681 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import exceptions
+from . import formatter
+from . import constants
+from . import models
+from . import types
+from . import utils
+import collections
+import threading
+import typing
+import math
+import re
+
+
+_conversions: dict[str, typing.Callable[[typing.Any], str]] = {
+    "r": repr,
+    "s": str,
+    "a": ascii,
+}
+
+
+def _render_field(value: typing.Any, conversion: Union[str, None], format_spec: str) -> str:
+    if conversion is not None:
+        value = _conversions[conversion](value)
+    return format(value, format_spec)
+
+
+class Frozen(formatter.AllPretty):
+    """Base class of the compiled objects (`Unit`, `RenderPlan` and `StrictParser`). They are
+    shared between every `Countdown` using the same template, and between threads, so their
+    attributes are set once in `__init__` and can not be assigned or deleted afterwards.
+    
+    """
+    __slots__ = ()
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def _init(self, **attrs: typing.Any) -> None:
+        for name, value in attrs.items():
+            object.__setattr__(self, name, value)
+
+
+Slots = tuple[tuple[int, str], ...]
+ValueSlots = tuple[tuple[int, Union[str, None], str], ...]
+
+
+class Unit(Frozen):
+    """The compiled slots of a single base flag (such as `S`) within a `RenderPlan`.
+    
+    """
+    __slots__ = ("name", "divisor", "empty", "singular", "plural", "values", "funcs")
+    def __init__(self, name: str, divisor: int, empty: Slots = (), singular: Slots = (),
+                 plural: Slots = (), values: ValueSlots = (),
+                 funcs: tuple[tuple[typing.Callable[[models.TimeValue], typing.Any], ValueSlots],
+                              ...] = ()) -> None:
+        self._init(name=name, divisor=divisor, empty=empty, singular=singular, plural=plural,
+                   values=values, funcs=funcs)
+
+
+class RenderPlan(Frozen):
+    """A format string compiled into a flat list of pieces, where each piece is either literal
+    text or a slot owned by a unit. Static values (extras, plurals, signs, and the empty variants
+    of every field) are rendered ahead of time, so rendering only has to run the divmod cascade
+    and fill in the numeric fields.
+    
+    """
+    __slots__ = ("pieces", "units", "z_slots", "remove_empty", "max_value", "strip_output",
+                 "scale")
+    def __init__(self, pieces: tuple[str, ...], units: tuple[Unit, ...],
+                 z_slots: tuple[tuple[int, tuple[str, str]], ...], remove_empty: bool,
+                 max_value: Union[int, None], strip_output: bool, scale: int = 1) -> None:
+        # `scale` is the number of input units per microsecond: 1, or 1000 if the plan has an
+        # `n` unit, in which case every method taking "microseconds" takes nanoseconds instead
+        self._init(pieces=pieces, units=units, z_slots=z_slots, remove_empty=remove_empty,
+                   max_value=max_value, strip_output=strip_output, scale=scale)
+
+    @property
+    def quantum(self) -> int:
+        """The greatest common divisor of the unit divisors (0 if there are no units). Every
+        input within the same quantum renders identically. For most format strings this is the
+        divisor of the smallest unit.
+        
+        """
+        return math.gcd(*(unit.divisor for unit in self.units))
+
+    def decompose(self, microseconds: Union[int, float]) -> tuple[typing.Literal[1, -1],
+                                                                  tuple[int, ...]]:
+        """Split `microseconds` into a sign and one value per unit (in `constants.MAP` order).
+        
+        """
+        z_flag = 1 if microseconds >= 0 else -1
+        remaining = abs(int(microseconds))
+        max_value = self.max_value
+        values: list[int] = []
+        for unit in self.units:
+            value, remaining = divmod(remaining, unit.divisor)
+            if max_value and value > max_value:
+                remaining += (value - max_value) * unit.divisor
+                value = max_value
+            values.append(value)
+        return z_flag, tuple(values)
+
+    def render_values(self, z_flag: typing.Literal[1, -1], values: typing.Sequence[int],
+                      ignore: bool = False) -> str:
+        """Render the plan given a sign and one value per unit.
+        
+        """
+        out = list(self.pieces)
+        sign = 0 if z_flag == 1 else 1
+        for index, variants in self.z_slots:
+            out[index] = variants[sign]
+
+        remove_empty = self.remove_empty
+        pending: list[Unit] = []
+        for unit, value in zip(self.units, values):
+            if value == 0 and remove_empty:
+                for index, text in unit.empty:
+                    out[index] = text
+                continue
+            for index, text in (unit.singular if value in (1, -1) else unit.plural):
+                out[index] = text
+            for index, conversion, format_spec in unit.values:
+                out[index] = (format(value, format_spec) if conversion is None else
+                              _render_field(value, conversion, format_spec))
+            if unit.funcs:
+                pending.append(unit)
+
+        if pending:
+            self.fill_funcs(out, z_flag, values, pending, ignore)
+        return self.join(out)
+
+    def fill_unit(self, out: list[str], unit: Unit, value: int) -> None:
+        """Fill the slots of a single unit in `out` (a copy of `.pieces`), except for those
+        using callable defaults (see `.fill_funcs`).
+        
+        """
+        if value == 0 and self.remove_empty:
+            for index, text in unit.empty:
+                out[index] = text
+            return
+        for index, text in (unit.singular if value in (1, -1) else unit.plural):
+            out[index] = text
+        for index, conversion, format_spec in unit.values:
+            out[index] = _render_field(value, conversion, format_spec)
+
+    def fill_funcs(self, out: list[str], z_flag: typing.Literal[1, -1],
+                   values: typing.Sequence[int], units: typing.Iterable[Unit],
+                   ignore: bool = False) -> None:
+        """Call the callable defaults of `units` and fill their slots in `out`.
+        
+        """
+        tval = models.TimeValue(z=z_flag)
+        for unit, value in zip(self.units, values):
+            setattr(tval, unit.name, value)
+        for unit in units:
+            for func, fields in unit.funcs:
+                if ignore:
+                    try:
+                        result = func(tval)
+                    except Exception:
+                        result = str(func)
+                else:
+                    result = func(tval)
+                for index, conversion, format_spec in fields:
+                    out[index] = _render_field(result, conversion, format_spec)
+
+    def join(self, out: list[str]) -> str:
+        """Join the filled pieces into the final output string.
+        
+        """
+        formatted = "".join(out)
+        if self.strip_output:
+            return formatted.strip()
+        return formatted
+
+    def render(self, microseconds: Union[int, float], ignore: bool = False) -> str:
+        """Render the plan given a number of microseconds.
+        
+        """
+        z_flag, values = self.decompose(microseconds)
+        return self.render_values(z_flag, values, ignore)
+
+
+def next_change(units: typing.Sequence[tuple[int, bool]], max_value: Union[int, None],
+                microseconds: int, render: typing.Callable[[int], str]) -> Union[int, None]:
+    """Return the number of microseconds that `microseconds` has to decrease by before
+    `render(microseconds)` returns a different string, or `None` if it never will. `units` holds
+    the `(divisor, fully_visible)` pair of each unit in the cascade used by `render`, where
+    `fully_visible` is `False` for units that only appear through static extras or plurals (so
+    that only their transitions to and from 0 and 1 can be seen).
+
+    The output only depends on the sign and the per-unit values, so the earliest candidate time
+    is computed from the cascade and then confirmed by rendering.
+    
+    """
+    start = microseconds
+    current = render(microseconds)
+    last = len(units) - 1
+    while True:
+        remaining = abs(microseconds)
+        candidates: list[int] = []
+        for index, (divisor, fully_visible) in enumerate(units):
+            value, remaining = divmod(remaining, divisor)
+            clamped = bool(max_value) and value >= max_value
+            if clamped:
+                remaining += (value - max_value) * divisor
+                value = max_value
+            if microseconds >= 0:
+                # the value drops to `k` once the remainder above `k * divisor` is used up
+                if fully_visible or index < last:
+                    candidates.append(remaining + 1)
+                else:
+                    candidates.extend((value - k - 1) * divisor + remaining + 1 for k in (1, 0)
+                                      if value > k)
+            elif not clamped:
+                # the value rises to `k` once the remainder reaches `k * divisor`
+                if fully_visible or index < last:
+                    candidates.append(divisor - remaining)
+                else:
+                    candidates.extend((k - value) * divisor - remaining for k in (1, 2)
+                                      if value < k)
+
+        if microseconds >= 0:
+            # the sign flips once everything is used up
+            candidates.append(abs(microseconds) + 1)
+        if not candidates:
+            return None
+
+        moved = microseconds - min(candidates)
+        if render(moved) != current:
+            return start - moved
+        microseconds = moved
+
+
+class CacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _CacheStripe:
+    __slots__ = ("lock", "data", "maxsize", "hits", "misses")
+    def __init__(self, maxsize: int) -> None:
+        self.lock = threading.Lock()
+        # a plain dict (whose operations are atomic, including on free-threaded builds) in
+        # order of use, least recently used first
+        self.data: dict[tuple[int, int], str] = {}
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+
+# the most stripes a `RenderCache` is split into, and the fewest entries each stripe must hold
+CACHE_STRIPES = 16
+CACHE_STRIPE_MIN_SIZE = 64
+
+
+class RenderCache:
+    """A bounded LRU cache in front of `RenderPlan.render`. Inputs are quantized to
+    `RenderPlan.quantum`. Must not be used with plans that have callable defaults.
+
+    The cache is safe to use from multiple threads. It is split into up to `CACHE_STRIPES`
+    independent LRU stripes (selected by the quantized input). Hits do not take a lock: the entry
+    is popped and re-inserted to mark it as recently used, so a concurrent lookup of the same key
+    may miss and render it again. Insertions and evictions take the lock of their stripe, which
+    is never held while rendering. Each stripe evicts on its own, so the least recently used
+    entry overall is not always the first to go, and the hit count may undercount slightly
+    under contention.
+    
+    """
+    __slots__ = ("plan", "maxsize", "quantum", "_stripes", "_mask")
+    def __init__(self, plan: RenderPlan, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.plan = plan
+        self.maxsize = maxsize
+        self.quantum = plan.quantum or None
+        count = 1
+        while count < CACHE_STRIPES and maxsize // (count * 2) >= CACHE_STRIPE_MIN_SIZE:
+            count *= 2
+        self._stripes = tuple(_CacheStripe(maxsize // count + (i < maxsize % count))
+                              for i in range(count))
+        self._mask = count - 1
+
+    def render(self, microseconds: Union[int, float], ignore: bool = False) -> str:
+        """Same as `RenderPlan.render`, but cached.
+        
+        """
+        z_flag = 1 if microseconds >= 0 else -1
+        quantum = self.quantum
+        quantized = abs(int(microseconds)) // quantum if quantum else 0
+        key = (z_flag, quantized)
+        stripe = self._stripes[quantized & self._mask]
+        data = stripe.data
+        result = data.pop(key, None)
+        if result is not None:
+            data[key] = result
+            stripe.hits += 1
+            return result
+        if ignore:
+            # output from the `ignore` fallback (which replaces a failing callable default with
+            # its `str`) is not cached, since a later call without `ignore` must raise instead
+            try:
+                result = self.plan.render(microseconds)
+            except Exception:
+                return self.plan.render(microseconds, True)
+        else:
+            result = self.plan.render(microseconds)
+        with stripe.lock:
+            stripe.misses += 1
+            data[key] = result
+            while len(data) > stripe.maxsize:
+                try:
+                    del data[next(iter(data))]
+                except StopIteration:
+                    # emptied by lock-free hits that have not re-inserted their entries yet
+                    break
+                except (RuntimeError, KeyError):
+                    # raced with a lock-free hit moving an entry; look again
+                    continue
+        return result
+
+    def info(self) -> CacheInfo:
+        hits = misses = currsize = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                hits += stripe.hits
+                misses += stripe.misses
+                currsize += len(stripe.data)
+        return CacheInfo(hits, misses, self.maxsize, currsize)
+
+    def clear(self) -> None:
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.data.clear()
+                stripe.hits = 0
+                stripe.misses = 0
+
+
+def _unit_keys(flag: formatter.Flag, defaults: dict[str, typing.Any]
+               ) -> Union[dict[str, tuple[str, typing.Any]], None]:
+    keys: dict[str, tuple[str, typing.Any]] = {flag.name: ("value", None)}
+    for spec in flag.plurals:
+        keys[f"_{flag.name}__{spec}"] = ("static", ("", "", formatter.plural_flag_to_plural[spec]))
+    for ext in flag.extras:
+        try:
+            default = defaults[ext]
+        except KeyError:
+            return None
+        if utils.is_callable_default(default):
+            keys[f"_{flag.name}__{ext}"] = ("func", default)
+        else:
+            keys[f"_{flag.name}__{ext}"] = ("static", ("", default, default))
+    return keys
+
+
+def compile_plan(flags: formatter.FlagSet, fmt: str, defaults: dict[str, typing.Any],
+                 remove_empty: bool, max_value: Union[int, None], strip_output: bool
+                 ) -> Union[RenderPlan, None]:
+    """Compile the output of `formatter.update_fmt` into a `RenderPlan`. `None` is returned if
+    the format string uses something the plan does not model (nested replacement fields, unknown
+    field names, missing defaults, etc.), in which case the caller should fall back to formatting
+    with `str.format`, which will produce the same output (or raise the same error).
+    
+    """
+    divisors: dict[str, int] = {}
+    owners: dict[str, tuple[str, str, typing.Any]] = {}
+    scale = 1
+    unit_map = constants.MAP
+    if "n" in flags:
+        scale = constants.NANOSECONDS_IN_MICROSECOND
+        unit_map = constants.NS_MAP
+    for name, divisor in unit_map.items():
+        flag = flags.get(name, None)
+        if flag is None:
+            continue
+        keys = _unit_keys(flag, defaults)
+        if keys is None:
+            return None
+        for key, (kind, payload) in keys.items():
+            owners[key] = (name, kind, payload)
+        divisors[name] = divisor
+
+    pieces: list[str] = []
+    z_slots: list[tuple[int, tuple[str, str]]] = []
+    slots: dict[str, dict[str, typing.Any]] = {name: {"empty": [], "singular": [], "plural": [],
+                                                      "values": [], "funcs": {}}
+                                               for name in divisors}
+    try:
+        for literal_text, field_name, format_spec, conversion in formatter.str_formatter.parse(fmt):
+            if literal_text:
+                pieces.append(literal_text)
+            if field_name is None:
+                continue
+            if "{" in format_spec or (conversion is not None and conversion not in _conversions):
+                return None
+
+            index = len(pieces)
+            pieces.append("")
+            if field_name == "z":
+                z_slots.append((index, (_render_field("+", conversion, format_spec),
+                                        _render_field("-", conversion, format_spec))))
+                continue
+
+            try:
+                name, kind, payload = owners[field_name]
+            except KeyError:
+                return None
+            unit_slots = slots[name]
+            unit_slots["empty"].append((index, _render_field("", conversion, format_spec)))
+            if kind == "value":
+                unit_slots["values"].append((index, conversion, format_spec))
+            elif kind == "func":
+                unit_slots["funcs"].setdefault(field_name, (payload, []))[1].append(
+                    (index, conversion, format_spec))
+            else:
+                _, singular, plural = payload
+                unit_slots["singular"].append((index, _render_field(singular, conversion,
+                                                                    format_spec)))
+                unit_slots["plural"].append((index, _render_field(plural, conversion,
+                                                                  format_spec)))
+    except Exception:
+        return None
+
+    units = [Unit(name, divisors[name], tuple(unit_slots["empty"]),
+                  tuple(unit_slots["singular"]), tuple(unit_slots["plural"]),
+                  tuple(unit_slots["values"]),
+                  tuple((func, tuple(fields)) for func, fields in unit_slots["funcs"].values()))
+             for name, unit_slots in slots.items()]
+    return RenderPlan(tuple(pieces), tuple(units), tuple(z_slots), remove_empty, max_value,
+                      strip_output, scale)
+
+
+class Template(typing.NamedTuple):
+    """The compiled, shareable parts of a `Countdown`: the output of `formatter.update_fmt` and
+    the `RenderPlan` (or `None`) built from it.
+    
+    """
+    flags: formatter.FlagSet
+    fmt: str
+    plan: Union[RenderPlan, None]
+
+
+TEMPLATE_CACHE_SIZE = 256
+_template_cache: collections.OrderedDict[tuple, Template] = collections.OrderedDict()
+_template_cache_lock = threading.Lock()
+_template_cache_stats = [0, 0] # hits, misses
+
+
+# defaults of these exact types render the same whenever they compare equal, so they can be part
+# of the intern key (unlike e.g. `0.0` and `-0.0`, or `Decimal("1.0")` and `Decimal("1.00")`)
+_INTERNABLE_TYPES = (str, int, bool, type(None))
+
+
+def _template_key(fmt: types.SupportsBracketFormat, defaults: dict[str, typing.Any],
+                  remove_empty: bool, max_value: Union[int, None], strip_output: bool
+                  ) -> Union[tuple, None]:
+    # the type of each default is part of the key since e.g. `True == 1` but they render
+    # differently; `None` is returned if any default could render differently from another
+    # default that compares equal to it (callables are compared by identity), or if anything is
+    # unhashable
+    for value in defaults.values():
+        if type(value) not in _INTERNABLE_TYPES and not utils.is_callable_default(value):
+            return None
+    key = (type(fmt), fmt, remove_empty, type(max_value), max_value, strip_output,
+           tuple(sorted((k, type(v), v) for k, v in defaults.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def build_template(fmt: types.SupportsBracketFormat, defaults: dict[str, typing.Any],
+                   remove_empty: bool, max_value: Union[int, None], strip_output: bool
+                   ) -> Template:
+    flags, updated = formatter.update_fmt(fmt)
+    return Template(flags, updated, compile_plan(flags, updated, defaults, remove_empty, max_value,
+                                                 strip_output))
+
+
+def get_template(fmt: types.SupportsBracketFormat, defaults: dict[str, typing.Any],
+                 remove_empty: bool, max_value: Union[int, None], strip_output: bool
+                 ) -> Template:
+    """Same as `build_template`, but the result is interned in a process-wide, thread-safe LRU
+    cache of up to `TEMPLATE_CACHE_SIZE` entries, keyed on the format string, the options and
+    the defaults. Templates with defaults other than `str`, `int`, `bool`, `None` and callables
+    (e.g. floats, since `0.0 == -0.0` but they render differently) are built every time.
+    
+    """
+    key = _template_key(fmt, defaults, remove_empty, max_value, strip_output)
+    if key is None:
+        return build_template(fmt, defaults, remove_empty, max_value, strip_output)
+    with _template_cache_lock:
+        template = _template_cache.get(key)
+        if template is not None:
+            _template_cache.move_to_end(key)
+            _template_cache_stats[0] += 1
+            return template
+        _template_cache_stats[1] += 1
+    # built outside of the lock; if two threads race, the first result to be stored wins
+    template = build_template(fmt, defaults, remove_empty, max_value, strip_output)
+    with _template_cache_lock:
+        template = _template_cache.setdefault(key, template)
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template
+
+
+def template_cache_info() -> CacheInfo:
+    with _template_cache_lock:
+        return CacheInfo(*_template_cache_stats, TEMPLATE_CACHE_SIZE, len(_template_cache))
+
+
+def template_cache_clear() -> None:
+    with _template_cache_lock:
+        _template_cache.clear()
+        _template_cache_stats[:] = [0, 0]
+
+
+class StrictParser(Frozen):
+    """Parses strings produced by a `RenderPlan` with a single anchored regex, built from the
+    plan's pieces in order. Each unit's value is captured by a named group, and the slots that
+    depend on a unit being present are made optional when `remove_empty` is set.
+    
+    """
+    __slots__ = ("pattern", "unit_names", "plus", "strip_input")
+    def __init__(self, pattern: re.Pattern, unit_names: tuple[str, ...],
+                 plus: Union[str, None], strip_input: bool) -> None:
+        self._init(pattern=pattern, unit_names=unit_names, plus=plus, strip_input=strip_input)
+
+    def _match(self, parsable: str) -> dict[str, Union[str, None]]:
+        if self.strip_input:
+            parsable = parsable.strip()
+        match = self.pattern.fullmatch(parsable)
+        if match is None:
+            raise exceptions.ParseError(f"String does not match format: '{parsable}'")
+        return match.groupdict()
+
+    def parse(self, parsable: str) -> models.TimeValue:
+        """Parse `parsable` into a new `TimeValue` object, raising `exceptions.ParseError` if the
+        whole string does not match.
+        
+        """
+        groups = self._match(parsable)
+        tval = models.TimeValue(z=1 if self.plus is None or groups["z"] == self.plus else -1)
+        for name in self.unit_names:
+            value = groups[name]
+            setattr(tval, name, 0 if value is None else int(value))
+        return tval
+
+    def parse_total(self, parsable: str) -> int:
+        """Same as `.parse`, but returns the total number of microseconds rather than a
+        `TimeValue` object.
+        
+        """
+        groups = self._match(parsable)
+        total = 0
+        for name in self.unit_names:
+            value = groups[name]
+            if value is not None:
+                total += int(value) * constants.NS_MAP[name]
+        total //= constants.NANOSECONDS_IN_MICROSECOND
+        if self.plus is not None and groups["z"] != self.plus:
+            return -total
+        return total
+
+
+def _text_regex(text: str, strip: bool) -> str:
+    # when the output is stripped, whitespace at the edges of a piece may have been removed if
+    # that piece ended up at the start or end of the output
+    if not strip:
+        return re.escape(text)
+    core = text.strip()
+    if not core:
+        return f"(?:{re.escape(text)}|\\A|\\Z)" if text else ""
+    lead = text[:len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    regex = re.escape(core)
+    if lead:
+        regex = f"(?:{re.escape(lead)}|\\A){regex}"
+    if trail:
+        regex = f"{regex}(?:{re.escape(trail)}|\\Z)"
+    return regex
+
+
+def _alternation(regexes: typing.Iterable[str]) -> str:
+    unique = sorted(set(regexes), key=len, reverse=True)
+    if len(unique) == 1:
+        return unique[0]
+    return f"(?:{'|'.join(unique)})"
+
+
+def compile_strict_parser(plan: RenderPlan) -> StrictParser:
+    """Build a `StrictParser` for the given `RenderPlan`.
+    
+    """
+    strip = plan.strip_output
+    text = lambda t: _text_regex(t, strip)
+
+    # map each piece index to the regex it should produce when its unit is present
+    present: dict[int, tuple[Unit, str]] = {}
+    empty: dict[int, str] = {}
+    first_value: dict[Unit, int] = {}
+    for unit in plan.units:
+        for index, empty_text in unit.empty:
+            empty[index] = text(empty_text)
+        singular = dict(unit.singular)
+        for index, plural_text in unit.plural:
+            present[index] = (unit, _alternation((text(singular[index]), text(plural_text))))
+        for index, _conversion, format_spec in unit.values:
+            first_value.setdefault(unit, index)
+            digits = r"(\d+)" if not format_spec else r"\s*(\d+)\s*"
+            present[index] = (unit, digits)
+        for _func, fields in unit.funcs:
+            for index, _conversion, _format_spec in fields:
+                present[index] = (unit, ".*?")
+
+    value_indices = {index for unit in plan.units for index, *_ in unit.values}
+    z_indices = dict(plan.z_slots)
+    plus = None
+    data: list[str] = []
+    for index, piece in enumerate(plan.pieces):
+        if index in z_indices:
+            variants = z_indices[index]
+            if plus is None:
+                plus = variants[0]
+                data.append(f"(?P<z>{_alternation(map(text, variants))})")
+            else:
+                data.append("(?P=z)")
+            continue
+        if index not in present:
+            data.append(text(piece))
+            continue
+
+        unit, regex = present[index]
+        first = first_value.get(unit)
+        if index in value_indices:
+            if index == first:
+                regex = regex.replace("(", f"(?P<{unit.name}>", 1)
+            else:
+                regex = regex.replace(r"(\d+)", f"(?P={unit.name})", 1)
+        if not plan.remove_empty:
+            data.append(regex)
+        elif first is not None and index > first:
+            data.append(f"(?({unit.name}){regex}|{empty[index]})")
+        elif empty[index]:
+            data.append(f"(?:{regex}|{empty[index]})")
+        else:
+            data.append(f"(?:{regex})?")
+
+    unit_names = tuple(unit.name for unit in plan.units if unit in first_value)
+    return StrictParser(re.compile("".join(data)), unit_names, plus, strip)
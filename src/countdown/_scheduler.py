@@ -0,0 +1,223 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import _ticker
+from . import utils
+import functools
+import datetime
+import typing
+import heapq
+
+if typing.TYPE_CHECKING:
+    import asyncio
+    from ._countdown import Countdown
+
+
+class ScheduledCountdown:
+    """A handle to a countdown registered with a `CountdownScheduler`.
+    
+    """
+    __slots__ = ("deadline", "callback", "on_expire", "text", "cancelled", "expired")
+    def __init__(self, deadline: int, callback: typing.Callable[[str], typing.Any],
+                 on_expire: Union[typing.Callable[[], typing.Any], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.on_expire = on_expire
+        self.text: Union[str, None] = None
+        self.cancelled = False
+        self.expired = False
+
+    def cancel(self) -> None:
+        """Stop receiving updates for this countdown.
+        
+        """
+        self.cancelled = True
+
+
+class CountdownScheduler:
+    """Drives any number of countdowns rendered with the same `Countdown` template from a single
+    asyncio task. Registered countdowns are kept in a heap ordered by the next time their
+    rendered string changes (see `Countdown.next_change`), so the task only wakes up when at
+    least one of them needs to be re-rendered. The callback of a countdown is only called when
+    its rendered string actually differs from the last one.
+
+    An exception raised by a callback (or by an awaitable it returns, or while rendering) does
+    not stop the scheduler: it is passed to `on_error(entry, exception)` if given, and logged
+    otherwise, and the countdown keeps being scheduled.
+
+    Example Usage
+    -------------
+    ```
+    >>> scheduler = CountdownScheduler(Countdown.default)
+    >>> scheduler.add(auction.ends_at, functools.partial(push_update, auction.id))
+    >>> await scheduler.run()
+    ```
+    
+    """
+    _log = utils.LazyLogger("CountdownScheduler", package=__name__)
+    def __init__(self, countdown: "Countdown",
+                 on_error: typing.Callable[[ScheduledCountdown, Exception], typing.Any] = None
+                 ) -> None:
+        self.countdown = countdown
+        self.on_error = on_error
+        # tasks of awaitable callback results, referenced until done so they are not collected
+        self._tasks: set["asyncio.Future"] = set()
+        self._heap: list[tuple[int, int, ScheduledCountdown]] = []
+        self._counter = 0
+        self._wakeup: Union["asyncio.Event", None] = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, entry in self._heap if not entry.cancelled)
+
+    def add(self, deadline: Union[datetime.datetime, int, float],
+            callback: typing.Callable[[str], typing.Any],
+            on_expire: typing.Callable[[], typing.Any] = None) -> ScheduledCountdown:
+        """Register a countdown to `deadline` (a datetime, or seconds since the epoch).
+        `callback` is called with the newly rendered string every time it changes (starting with
+        the first render on the next iteration of the scheduler), and `on_expire` (if given) is
+        called once after the final render at 0. Callbacks returning awaitables are scheduled as
+        tasks.
+        
+        """
+        entry = ScheduledCountdown(_ticker.to_epoch_us(deadline), callback, on_expire)
+        self._push(0, entry)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return entry
+
+    def _push(self, when: int, entry: ScheduledCountdown) -> None:
+        self._counter += 1
+        heapq.heappush(self._heap, (when, self._counter, entry))
+
+    def _next_wake(self, entry: ScheduledCountdown, remaining: int) -> Union[int, None]:
+        # the epoch microseconds at which the rendered string will next change (or the deadline
+        # itself, once it will not change before then), or None if the deadline has been reached
+        if remaining == 0:
+            return None
+        delta = self.countdown.next_change(remaining)
+        if delta is None or delta > remaining:
+            return entry.deadline
+        return entry.deadline - remaining + delta
+
+    def _report(self, entry: ScheduledCountdown, exc: Exception) -> None:
+        if self.on_error is None:
+            self._log.error("Error in the callbacks of %r", entry, exc_info=exc)
+            return
+        try:
+            self.on_error(entry, exc)
+        except Exception:
+            self._log.exception("Error in the on_error callback of %r", entry)
+
+    def _task_done(self, entry: ScheduledCountdown, task: "asyncio.Future") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._report(entry, task.exception())
+
+    def _call(self, entry: ScheduledCountdown, func: typing.Callable, *args: typing.Any) -> None:
+        try:
+            result = func(*args)
+        except Exception as exc:
+            self._report(entry, exc)
+            return
+        if result is not None:
+            import inspect
+            if inspect.isawaitable(result):
+                import asyncio
+                task = asyncio.ensure_future(result)
+                self._tasks.add(task)
+                task.add_done_callback(functools.partial(self._task_done, entry))
+
+    def _fire(self, entry: ScheduledCountdown, now: int) -> None:
+        remaining = max(0, entry.deadline - now)
+        try:
+            next_wake = self._next_wake(entry, remaining)
+            text = self.countdown.format(remaining)
+        except Exception as exc:
+            # rendering failed (e.g. in a callable default); try again at the deadline
+            self._report(entry, exc)
+            next_wake = entry.deadline if remaining else None
+            text = entry.text
+        if next_wake is not None:
+            self._push(next_wake, entry)
+        if text != entry.text:
+            entry.text = text
+            self._call(entry, entry.callback, text)
+        if next_wake is None:
+            entry.expired = True
+            if entry.on_expire is not None:
+                self._call(entry, entry.on_expire)
+
+    def run_pending(self, now: int = None) -> int:
+        """Render every countdown that is due at `now` (epoch microseconds; defaults to the
+        current time) and return the epoch microseconds of the next wake up (or -1 if there are
+        no countdowns left).
+        
+        """
+        if now is None:
+            now = _ticker.now_us()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, entry = heapq.heappop(heap)
+            if not entry.cancelled:
+                self._fire(entry, now)
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else -1
+
+    async def run(self, *, until_empty: bool = False) -> None:
+        """Run the scheduler until `.stop` is called (or, if `until_empty` is `True`, until no
+        countdowns are left).
+        
+        """
+        import asyncio
+        self._stopped = False
+        self._wakeup = asyncio.Event()
+        try:
+            while not self._stopped:
+                self._wakeup.clear()
+                next_wake = self.run_pending()
+                if next_wake == -1:
+                    if until_empty:
+                        return
+                    await self._wakeup.wait()
+                    continue
+                delay = (next_wake - _ticker.now_us()) / 1_000_000
+                if delay <= 0:
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wakeup = None
+
+    def stop(self) -> None:
+        """Stop a running `.run` call after its current iteration.
+        
+        """
+        self._stopped = True
+        if self._wakeup is not None:
+            self._wakeup.set()
@@ -0,0 +1,184 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+from . import _plan
+from . import utils
+import datetime
+import typing
+import time
+
+if typing.TYPE_CHECKING:
+    from ._countdown import Countdown
+
+
+def now_us() -> int:
+    """The current wall-clock time as integer microseconds since the epoch.
+    
+    """
+    return time.time_ns() // 1_000
+
+
+def to_epoch_us(target: Union[datetime.datetime, int, float]) -> int:
+    """Convert a `datetime.datetime` (naive datetimes are treated as local time) or a number of
+    seconds since the epoch into integer microseconds since the epoch.
+    
+    """
+    if isinstance(target, datetime.datetime):
+        if target.tzinfo is None:
+            target = target.astimezone()
+        delta = target - datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+        return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return round(target * 1_000_000)
+
+
+class Decomposition:
+    """The per-unit values of a non-negative number of microseconds, which can be decreased
+    incrementally. Subtracting only touches the leftover below the smallest unit unless it goes
+    negative, in which case the deficit is borrowed from the smallest units that can cover it and
+    only those units are re-split.
+    
+    """
+    __slots__ = ("divisors", "values", "leftover")
+    def __init__(self, plan: _plan.RenderPlan, microseconds: int) -> None:
+        self.divisors = [unit.divisor for unit in plan.units]
+        _, values = plan.decompose(microseconds)
+        self.values = list(values)
+        self.leftover = microseconds - sum(v * d for v, d in zip(self.values, self.divisors))
+
+    def subtract(self, microseconds: int) -> list[int]:
+        """Subtract `microseconds` (which must not make the total negative) and return the
+        indices of the units whose value changed.
+        
+        """
+        leftover = self.leftover - microseconds
+        if leftover >= 0:
+            self.leftover = leftover
+            return []
+
+        values = self.values
+        divisors = self.divisors
+        start = len(values)
+        while leftover < 0:
+            start -= 1
+            leftover += values[start] * divisors[start]
+
+        changed: list[int] = []
+        for index in range(start, len(values)):
+            value, leftover = divmod(leftover, divisors[index])
+            if value != values[index]:
+                values[index] = value
+                changed.append(index)
+        self.leftover = leftover
+        return changed
+
+
+class Ticker:
+    """Renders a countdown to `target` once per `step`, with sleeps aligned to the moments the
+    remaining time crosses a multiple of `step`. Can be iterated synchronously (blocking with
+    `time.sleep`) or asynchronously (with `asyncio.sleep`). Iteration stops after the countdown
+    has been rendered at 0.
+    
+    """
+    def __init__(self, countdown: "Countdown", target: Union[datetime.datetime, int, float],
+                 step: Union[int, datetime.timedelta, None] = None, ignore: bool = False) -> None:
+        self.countdown = countdown
+        self.target = to_epoch_us(target)
+        plan = countdown.plan
+        if step is None:
+            step = plan.quantum // plan.scale if plan is not None else 0
+        elif isinstance(step, datetime.timedelta):
+            step = utils.timedelta_to_microseconds(step)
+        self.step = step or 1_000_000
+        self.ignore = ignore
+
+    def _renderer(self, remaining: int) -> typing.Callable[[int], str]:
+        countdown = self.countdown
+        plan = countdown.plan
+        ignore = self.ignore
+        if plan is None or plan.max_value or plan.scale != 1:
+            return lambda remaining: countdown.format(remaining, ignore=ignore)
+
+        state = Decomposition(plan, remaining)
+        units = plan.units
+        remove_empty = plan.remove_empty
+        out = list(plan.pieces)
+        for index, variants in plan.z_slots:
+            out[index] = variants[0]
+        for unit, value in zip(units, state.values):
+            plan.fill_unit(out, unit, value)
+        has_funcs = any(unit.funcs for unit in units)
+        current = remaining
+
+        def render(remaining: int) -> str:
+            nonlocal current
+            for index in state.subtract(current - remaining):
+                plan.fill_unit(out, units[index], state.values[index])
+            current = remaining
+            if has_funcs:
+                plan.fill_funcs(out, 1, state.values,
+                                [unit for unit, value in zip(units, state.values)
+                                 if unit.funcs and not (value == 0 and remove_empty)], ignore)
+            return plan.join(out)
+
+        return render
+
+    def _next(self, remaining: int) -> int:
+        # the next multiple of `step` strictly below `remaining`
+        return max(0, (remaining - 1) // self.step * self.step)
+
+    def _caught_up(self, wake: int, actual: int) -> int:
+        # skip any boundaries that were missed while sleeping
+        return min(wake, max(0, -(-actual // self.step) * self.step))
+
+    def __iter__(self) -> typing.Iterator[str]:
+        target = self.target
+        remaining = max(0, target - now_us())
+        render = self._renderer(remaining)
+        yield render(remaining)
+        while remaining > 0:
+            wake = self._next(remaining)
+            while True:
+                actual = target - now_us()
+                if actual <= wake:
+                    break
+                time.sleep((actual - wake) / 1_000_000)
+            remaining = self._caught_up(wake, actual)
+            yield render(remaining)
+
+    async def __aiter__(self) -> typing.AsyncIterator[str]:
+        import asyncio
+        target = self.target
+        remaining = max(0, target - now_us())
+        render = self._renderer(remaining)
+        yield render(remaining)
+        while remaining > 0:
+            wake = self._next(remaining)
+            while True:
+                actual = target - now_us()
+                if actual <= wake:
+                    break
+                await asyncio.sleep((actual - wake) / 1_000_000)
+            remaining = self._caught_up(wake, actual)
+            yield render(remaining)
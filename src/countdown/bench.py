@@ -0,0 +1,312 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+# Benchmarks for the hot paths of `countdown`. Run `python -m countdown.bench --help` for usage.
+#
+# Each scenario measures the mean time of a single operation (in nanoseconds) as the best of a
+# number of repeats. Results can be saved as a JSON baseline (`--save`) and later compared against
+# (`--compare`), in which case the exit code is 1 if any scenario got slower than `--threshold`.
+# `--profile DIR` additionally writes a cProfile dump per scenario to `DIR/<scenario>.prof`.
+
+from typing import Union
+from . import formatter
+from . import _countdown
+from . import models
+from . import _board
+import datetime
+import argparse
+import platform
+import random
+import typing
+import json
+import time
+import sys
+import os
+
+Scenario = typing.Callable[[int], typing.Callable[[], typing.Any]]
+
+SIMPLE = "{h}:{m}:{S}"
+COMPLEX = ("T{z}{y.Ea}{y}[_]{Eb}{M}{Ec}{p}{w}{Ed}{P}{d}{Ee}{ep}{h}{Ef}{eP}{m}{Eg}{Ep}{S}{Eh}{EP}{s}"
+           "{Ei}{u}{Ej}")
+COMPLEX_DEFAULTS = dict(Ea="[YL]", Eb="[YR]", Ec="[mo]", Ed="[w]", Ee="[d]", Ef="[h]", Eg="[m]",
+                        Eh="[s]", Ei="[ms]", Ej="[microseconds] ")
+DEFAULT_THRESHOLD = 0.2
+SEED = 0
+
+
+def _seconds_suffix(tval: models.TimeValue) -> str:
+    return "s" if tval.S != 1 else " second"
+
+
+def _countdowns() -> dict[str, _countdown.Countdown]:
+    return {
+        "simple": _countdown.Countdown(SIMPLE),
+        "complex": _countdown.Countdown(COMPLEX, **COMPLEX_DEFAULTS),
+        "default": _countdown.Countdown.default,
+        "callable": _countdown.Countdown("{h}{hd} {m}{md} {S}{Sd}", hd="h", md="m",
+                                         Sd=lambda tval: "s" if tval.S != 1 else " second"),
+        "memoized": _countdown.Countdown("{h}{hd} {m}{md} {S}{Sd}", hd="h", md="m",
+                                         Sd=models.depends_on("S")(_seconds_suffix)),
+        "nanoseconds": _countdown.Countdown("{S}.{s}.{u}.{n}", remove_empty=False),
+    }
+
+
+def _values(n: int, high: int = 10 ** 14) -> list[int]:
+    rng = random.Random(SEED)
+    return [rng.randint(0, high) for _ in range(n)]
+
+
+def _update_fmt(fmt: str) -> Scenario:
+    def setup(n: int) -> typing.Callable[[], None]:
+        def run() -> None:
+            for _ in range(n):
+                formatter.update_fmt(fmt)
+        return run
+    return setup
+
+
+def _construct(name: str) -> Scenario:
+    def setup(n: int) -> typing.Callable[[], None]:
+        if name == "default":
+            def run() -> None:
+                for _ in range(n):
+                    _countdown.Countdown.default
+        else:
+            fmt, defaults = (SIMPLE, {}) if name == "simple" else (COMPLEX, COMPLEX_DEFAULTS)
+            def run() -> None:
+                for _ in range(n):
+                    _countdown.Countdown(fmt, **defaults)
+        return run
+    return setup
+
+
+def _format(name: str, method: str = "format", scale: int = 1,
+            convert: typing.Callable[[int], typing.Any] = None) -> Scenario:
+    def setup(n: int) -> typing.Callable[[], None]:
+        func = getattr(_countdowns()[name], method)
+        values = [v // scale for v in _values(n)]
+        if convert is not None:
+            values = [convert(v) for v in values]
+        def run() -> None:
+            for v in values:
+                func(v)
+        return run
+    return setup
+
+
+def _format_time(n: int) -> typing.Callable[[], None]:
+    func = _countdowns()["default"].format_time
+    values = [divmod(v, 1_000_000) for v in _values(n, 10 ** 12)]
+    def run() -> None:
+        for seconds, microseconds in values:
+            func(seconds=seconds, microseconds=microseconds)
+    return run
+
+
+def _format_datetime(n: int) -> typing.Callable[[], None]:
+    func = _countdowns()["default"].format_datetime
+    start = datetime.datetime(2000, 1, 1)
+    values = [start + datetime.timedelta(microseconds=v) for v in _values(n, 10 ** 14)]
+    def run() -> None:
+        for v in values:
+            func(start, v)
+    return run
+
+
+def _format_datetime_calendar(n: int) -> typing.Callable[[], None]:
+    func = _countdowns()["default"].format_datetime
+    start = datetime.datetime(2000, 1, 1)
+    values = [start + datetime.timedelta(microseconds=v) for v in _values(n, 10 ** 14)]
+    def run() -> None:
+        for v in values:
+            func(start, v, calendar=True)
+    return run
+
+
+def _format_datetimes(calendar: bool) -> Scenario:
+    def setup(n: int) -> typing.Callable[[], None]:
+        func = _countdowns()["default"].format_datetimes
+        start = datetime.datetime(2000, 1, 1)
+        values = [start + datetime.timedelta(microseconds=v) for v in _values(n, 10 ** 14)]
+        def run() -> None:
+            func(values, start, calendar=calendar)
+        return run
+    return setup
+
+
+def _board_render(n: int) -> typing.Callable[[], None]:
+    board = _board.DeadlineBoard(_countdowns()["default"],
+                                 enumerate(v / 10 ** 6 for v in _values(n, 10 ** 14)))
+    def run() -> None:
+        board.render(now=0)
+    return run
+
+
+def _parse(name: str, strict: bool = False) -> Scenario:
+    def setup(n: int) -> typing.Callable[[], None]:
+        cd = _countdowns()[name]
+        strings = [cd.format(v) for v in _values(n)]
+        cd.compile_parser(strict)
+        def run() -> None:
+            for s in strings:
+                cd.parse(s, strict=strict)
+        return run
+    return setup
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "update_fmt[simple]": _update_fmt(SIMPLE),
+    "update_fmt[complex]": _update_fmt(COMPLEX),
+    "construct[simple]": _construct("simple"),
+    "construct[complex]": _construct("complex"),
+    "construct[default]": _construct("default"),
+    "format[simple]": _format("simple"),
+    "format[complex]": _format("complex"),
+    "format[default]": _format("default"),
+    "format[callable]": _format("callable"),
+    "format[memoized]": _format("memoized"),
+    "format_microseconds": _format("default", "format_microseconds"),
+    "format_milliseconds": _format("default", "format_milliseconds", 10 ** 3),
+    "format_seconds": _format("default", "format_seconds", 10 ** 6),
+    "format_minutes": _format("default", "format_minutes", 60 * 10 ** 6),
+    "format_hours": _format("default", "format_hours", 3_600 * 10 ** 6),
+    "format_days": _format("default", "format_days", 86_400 * 10 ** 6),
+    "format_weeks": _format("default", "format_weeks", 604_800 * 10 ** 6),
+    "format_timedelta": _format("default", "format_timedelta",
+                                convert=lambda v: datetime.timedelta(microseconds=v)),
+    "format_ns": _format("default", "format_ns", convert=lambda v: v * 1_000 + 999),
+    "format_ns[n]": _format("nanoseconds", "format_ns", convert=lambda v: v * 1_000 + 999),
+    "format_time": _format_time,
+    "format_datetime": _format_datetime,
+    "format_datetime[calendar]": _format_datetime_calendar,
+    "format_datetimes": _format_datetimes(False),
+    "format_datetimes[calendar]": _format_datetimes(True),
+    "board_render": _board_render,
+    "parse[default]": _parse("default"),
+    "parse[complex]": _parse("complex"),
+    "parse_strict[default]": _parse("default", strict=True),
+    "parse_strict[complex]": _parse("complex", strict=True),
+}
+
+
+def run(names: typing.Iterable[str] = None, *, number: int = 2_000, repeat: int = 5,
+        profile_dir: str = None) -> dict[str, float]:
+    """Run the given scenarios (all by default) and return the best mean time per operation in
+    nanoseconds for each. If `profile_dir` is given, each scenario is additionally run once under
+    cProfile and the stats are dumped to `profile_dir/<scenario>.prof`.
+    
+    """
+    results: dict[str, float] = {}
+    for name in (SCENARIOS if names is None else names):
+        func = SCENARIOS[name](number)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            func()
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best / number
+        if profile_dir is not None:
+            import cProfile
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler = cProfile.Profile()
+            profiler.runcall(func)
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+    return results
+
+
+def to_json(results: dict[str, float]) -> dict[str, typing.Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "unit": "ns/op",
+        "results": results
+    }
+
+
+def compare(baseline: dict[str, float], results: dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, float, float, float]]:
+    """Return `(name, baseline, current, ratio)` for every scenario in both `baseline` and
+    `results` whose time grew by more than `threshold` (a fraction, e.g. 0.2 for 20%).
+    
+    """
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None or before <= 0:
+            continue
+        ratio = current / before
+        if ratio > 1 + threshold:
+            regressions.append((name, before, current, ratio))
+    return regressions
+
+
+def main(argv: Union[typing.Sequence[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m countdown.bench",
+                                     description="Benchmark the hot paths of countdown.")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run scenarios containing this substring (repeatable)")
+    parser.add_argument("-n", "--number", type=int, default=2_000,
+                        help="operations per repeat (default: %(default)s)")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="repeats per scenario; the best is kept (default: %(default)s)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction when comparing (default: %(default)s)")
+    parser.add_argument("--profile", metavar="DIR", help="write a cProfile dump per scenario")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    names = [name for name in SCENARIOS if not args.filter or any(f in name for f in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    results = run(names, number=args.number, repeat=args.repeat, profile_dir=args.profile)
+    width = max(map(len, results), default=0)
+    for name, ns in results.items():
+        line = f"{name:<{width}}  {ns:12.1f} ns/op"
+        before = None if baseline is None else baseline.get(name)
+        # same guard as `compare`: a missing or non-positive baseline has no ratio
+        if before is not None and before > 0:
+            line += f"  ({ns / before:.2f}x baseline)"
+        print(line)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(to_json(results), f, indent=2)
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for name, before, current, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.1f} -> {current:.1f} ns/op ({ratio:.2f}x)",
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
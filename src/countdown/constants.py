@@ -22,7 +22,7 @@ SOFTWARE.
 
 """
 
-BASE_FLAGS = {"y", "M", "w", "d", "h", "m", "S", "s", "u", "z"}
+BASE_FLAGS = {"y", "M", "w", "d", "h", "m", "S", "s", "u", "n", "z"}
 PLURAL_FLAGS = {"p", "P", "ep", "eP", "Ep", "EP"}
 MICROSECONDS_IN_MILLISECOND = 1_000
 MICROSECONDS_IN_SECOND = 1_000_000
@@ -43,3 +43,19 @@ MAP = {
     "s": MICROSECONDS_IN_MILLISECOND,
     "u": 1,
 }
+NANOSECONDS_IN_MICROSECOND = 1_000
+# the same cascade in nanoseconds, with the optional `n` unit; used by format strings that
+# contain `{n}`
+NS_MAP = {name: div * NANOSECONDS_IN_MICROSECOND for name, div in MAP.items()}
+NS_MAP["n"] = 1
+MICROSECONDS_IN_UNIT = {
+    "microseconds": 1,
+    "milliseconds": MICROSECONDS_IN_MILLISECOND,
+    "seconds": MICROSECONDS_IN_SECOND,
+    "minutes": MICROSECONDS_IN_MINUTE,
+    "hours": MICROSECONDS_IN_HOUR,
+    "days": MICROSECONDS_IN_DAY,
+    "weeks": MICROSECONDS_IN_WEEK,
+}
+# the number of values formatted (and bytes copied) per chunk by the buffer methods of `Countdown`
+CHUNK_SIZE = 65_536
@@ -27,14 +27,15 @@ from . import exceptions
 from . import constants
 from . import models
 from . import types
-import plogging
-import logging
-import inspect
+from . import utils
+import threading
 import string
 import typing
-import prepr
 import re
 
+if typing.TYPE_CHECKING:
+    import prepr
+
 
 str_formatter = string.Formatter()
 del string
@@ -59,7 +60,8 @@ def _mangled_fmt(parent: str, child: str, _format_spec: str, _conversion: str) -
 
 
 class AllPretty:
-    def __repr__(self, *args, **kwargs) -> prepr.pstr:
+    def __repr__(self, *args, **kwargs) -> "prepr.pstr":
+        import prepr
         attrs = {k:getattr(self, k) for k in self.__slots__}
         return prepr.prepr(self).kwargs(**attrs).build(simple=True, *args, **kwargs)
 
@@ -78,10 +80,10 @@ class Flag(AllPretty):
     connected to it.
     
     """
-    _log = plogging.setup_new("Flag", level=logging.INFO, package=__name__)
+    _log = utils.LazyLogger("Flag", package=__name__)
     __slots__ = ("name", "plurals", "parse_args", "parse_args_locked", "extras")
     def __init__(self, name: str) -> None:
-        Flag._log.debug(f"Creating flag: '{name}'")
+        Flag._log.debug("Creating flag: '%s'", name)
         self.name = name
         self.plurals: set[str] = set()
         self.parse_args: list[ParseArg] = list()
@@ -90,10 +92,21 @@ class Flag(AllPretty):
         # extras are stored as a defaultdict to act as a lazy ordered set
         # self.extras: collections.defaultdict[str, None] = collections.defaultdict(lambda: None)
 
+    def freeze(self) -> "Flag":
+        """Replace the mutable collections of this flag with immutable ones, so that it can be
+        shared between threads. Called by `FlagSet.freeze`.
+        
+        """
+        self.plurals = frozenset(self.plurals)
+        self.extras = frozenset(self.extras)
+        self.parse_args = tuple(self.parse_args)
+        self.parse_args_locked = True
+        return self
+
     def get_parse_info(self, defaults: dict[str, typing.Any],
                        target_regex: str = None) -> tuple[re.Pattern, int]:
         len_ = 0
-        parse_data: list[str] = [target_regex or "(\d+)"]
+        parse_data: list[str] = [target_regex or r"(\d+)"]
         for arg in self.parse_args:
             # add pretext
             len_ += len(arg.pretext)
@@ -111,7 +124,7 @@ class Flag(AllPretty):
                 raise exceptions.ParseError(f"Missing default: {arg.key}") from exc
             
             # handle if function
-            if inspect.isfunction(default):
+            if utils.is_callable_default(default):
                 parse_data.append(".*?")
                 continue
 
@@ -129,7 +142,7 @@ class Flag(AllPretty):
         """Get converted plural flags.
         
         """
-        Flag._log.debug(f"Acquiring converted plural specifiers for flag: '{self.name}'")
+        Flag._log.debug("Acquiring converted plural specifiers for flag: '%s'", self.name)
         plurals = {f"_{self.name}__{spec}": plural_flag_to_plural[spec]
                    for spec in self.plurals}
         return plurals
@@ -138,7 +151,7 @@ class Flag(AllPretty):
         """Get plural flags with values as empty strings.
         
         """
-        Flag._log.debug(f"Acquiring empty plural specifiers for flag: '{self.name}'")
+        Flag._log.debug("Acquiring empty plural specifiers for flag: '%s'", self.name)
         plurals = {f"_{self.name}__{spec}": "" for spec in self.plurals}
         return plurals
 
@@ -150,11 +163,11 @@ class Flag(AllPretty):
         """
         kwargs: dict[str, str] = dict()
         funcs: dict[str, typing.Callable[[models.TimeValue], typing.Any]] = dict()
-        Flag._log.debug(f"Acquiring extras for flag: '{self.name}' with defaults: {defaults}")
+        Flag._log.debug("Acquiring extras for flag: '%s' with defaults: %s", self.name, defaults)
         for ext in self.extras:
             try:
                 d = defaults[ext]
-                if inspect.isfunction(d):
+                if utils.is_callable_default(d):
                     funcs[f"_{self.name}__{ext}"] = d
                 else:
                     kwargs[f"_{self.name}__{ext}"] = d
@@ -166,7 +179,7 @@ class Flag(AllPretty):
         """Get extras with values as empty strings.
         
         """
-        Flag._log.debug(f"Acquiring empty extras for flag: '{self.name}'")
+        Flag._log.debug("Acquiring empty extras for flag: '%s'", self.name)
         extras = {f"_{self.name}__{ext}": "" for ext in self.extras}
         return extras
 
@@ -174,54 +187,177 @@ class Flag(AllPretty):
         """Get plurals, extras, and this flag with values as empty strings.
         
         """
-        Flag._log.debug(f"Acquiring empty kwargs for flag: '{self.name}'")
+        Flag._log.debug("Acquiring empty kwargs for flag: '%s'", self.name)
         kwargs = {self.name: ""}
         kwargs.update(self.get_empty_plurals())
         kwargs.update(self.get_empty_extras())
         return kwargs
 
 
-class Flags(list[Flag], AllPretty):
-    _log = plogging.setup_new("Flags", level=logging.INFO, package=__name__)
+class FlagSet(typing.Sequence[Flag]):
+    """An ordered collection of `Flag` instances with O(1) lookup by name. Flags are kept in order
+    of decreasing unit size (`z`, then `y` through `u`), regardless of the order in which they
+    were added. Supports the same indexing as a list of flags (by int, flag name, or `Flag`).
+
+    `update_fmt` freezes the collection (and every flag in it) once it is built; adding to a
+    frozen `FlagSet` raises `TypeError`.
+    
+    """
+    _log = utils.LazyLogger("Flags", package=__name__)
+    __slots__ = ("_flags", "_index", "_positions", "_frozen")
+    _rank = {name: i for i, name in enumerate(("z", *constants.MAP))}
+    def __init__(self, flags: typing.Iterable[Flag] = ()) -> None:
+        self._flags: list[Flag] = []
+        self._index: dict[str, Flag] = {}
+        self._positions: dict[str, int] = {} # the order in which the flags were added
+        self._frozen = False
+        for flag in flags:
+            self.append(flag)
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> "FlagSet":
+        if not self._frozen:
+            for flag in self._flags:
+                flag.freeze()
+            self._frozen = True
+        return self
+
+    def append(self, flag: Flag) -> None:
+        """Add `flag`, keeping the collection ordered by unit size. If a flag with the same name
+        is already present, it is replaced.
+        
+        """
+        if self._frozen:
+            raise TypeError("Cannot modify a frozen FlagSet")
+        name = flag.name
+        if name in self._index:
+            self._flags[self._flags.index(self._index[name])] = flag
+            self._index[name] = flag
+            return
+        rank = self._rank.get(name, len(self._rank))
+        i = len(self._flags)
+        while i and self._rank.get(self._flags[i - 1].name, len(self._rank)) > rank:
+            i -= 1
+        self._flags.insert(i, flag)
+        self._index[name] = flag
+        self._positions[name] = len(self._positions)
+
+    def in_template_order(self) -> list[Flag]:
+        """The flags in the order they first appeared in the format string.
+        
+        """
+        return sorted(self._flags, key=lambda flag: self._positions[flag.name])
+
+    def __len__(self) -> int:
+        return len(self._flags)
+
+    def __iter__(self) -> typing.Iterator[Flag]:
+        return iter(self._flags)
+
     def __contains__(self, other: Union[str, Flag]) -> bool:
         if isinstance(other, Flag):
             other = other.name
-        for f in self:
-            if f.name == other:
-                return True
-        return False
-    
-    def __getitem__(self, index: Union[str, Flag, int]) -> Flag:
-        if isinstance(index, int):
-            return super().__getitem__(index)
+        return other in self._index
 
+    @typing.overload
+    def __getitem__(self, index: Union[str, Flag, int]) -> Flag: ...
+    @typing.overload
+    def __getitem__(self, index: slice) -> list[Flag]: ...
+    def __getitem__(self, index):
+        if isinstance(index, (int, slice)):
+            return self._flags[index]
         if isinstance(index, Flag):
             index = index.name
-        for f in self:
-            if f.name == index:
-                return f
-        raise KeyError
-    
+        return self._index[index]
+
     @typing.overload
     def get(self, index: Union[str, Flag, int], /) -> Flag: ...
     @typing.overload
     def get(self, index: Union[str, Flag, int], default: types.T, /) -> Union[Flag, types.T]: ...
     def get(self, index: Union[str, Flag, int], default = types.MISSING, /):
-        """Get a `Flag` instance contained within this list given a flag name (str), a `Flag`
-        instance (in which case `Flag.name` is used), or an integer (in which case the value at
-        that index is returned). If a `default` is provided, that default will be returned if no
+        """Get a `Flag` instance contained within this collection given a flag name (str), a
+        `Flag` instance (in which case `Flag.name` is used), or an integer (in which case the value
+        at that index is returned). If a `default` is provided, that default will be returned if no
         `Flag` instance is found.
         
         """
         if default is types.MISSING:
-            Flags._log.debug(f"Acquiring flag by index: {index}")
+            FlagSet._log.debug("Acquiring flag by index: %s", index)
             return self[index]
-        Flags._log.debug(f"Acquiring flag by index: {index}; default={default}")
+        FlagSet._log.debug("Acquiring flag by index: %s; default=%s", index, default)
+        if isinstance(index, Flag):
+            index = index.name
+        if isinstance(index, str):
+            return self._index.get(index, default)
         try:
-            return self[index]
-        except KeyError:
+            return self._flags[index]
+        except IndexError:
             return default
 
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, FlagSet):
+            return self._flags == other._flags
+        if isinstance(other, list):
+            return self._flags == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._flags!r})"
+
+
+# kept for backwards compatibility
+Flags = FlagSet
+
+
+ParseInfo = tuple[tuple[str, re.Pattern, int], ...]
+PARSE_INFO_CACHE_SIZE = 128
+_parse_info_cache: dict[tuple, ParseInfo] = dict()
+_parse_info_cache_lock = threading.Lock()
+
+
+def build_parse_info(flags: FlagSet, defaults: dict[str, typing.Any]) -> ParseInfo:
+    """Build the compiled parse pattern of every flag in `flags`. The result is a tuple of
+    `(flag_name, pattern, static_length)`, sorted so that the patterns with the most static text
+    are tried first.
+    
+    """
+    parse_info = [(flag.name, *flag.get_parse_info(defaults)) if flag.name != "z" else
+                  (flag.name, *flag.get_parse_info(defaults, r"(-|\+)"))
+                  for flag in flags.in_template_order()]
+    parse_info.sort(key=lambda a: a[2], reverse=True)
+    return tuple(parse_info)
+
+
+def _defaults_key(defaults: dict[str, typing.Any]) -> tuple[tuple[str, Union[str, None]], ...]:
+    # parse patterns only depend on whether a default is callable and on its string value
+    return tuple(sorted((k, None if utils.is_callable_default(v) else str(v))
+                        for k, v in defaults.items()))
+
+
+def get_parse_info(fmt: types.SupportsBracketFormat, flags: FlagSet,
+                   defaults: dict[str, typing.Any]) -> ParseInfo:
+    """Same as `build_parse_info`, but the result is cached (keyed on `fmt` and `defaults`) and
+    shared between all `Countdown` instances using the same format string and defaults.
+    
+    """
+    key = (fmt, _defaults_key(defaults))
+    try:
+        return _parse_info_cache[key]
+    except KeyError:
+        pass
+    # built outside of the lock; if two threads race, the first result to be stored wins
+    parse_info = build_parse_info(flags, defaults)
+    with _parse_info_cache_lock:
+        if key not in _parse_info_cache and len(_parse_info_cache) >= PARSE_INFO_CACHE_SIZE:
+            # evict the oldest entry
+            _parse_info_cache.pop(next(iter(_parse_info_cache)))
+        return _parse_info_cache.setdefault(key, parse_info)
+
 
 def _add_parse_args(literal_text: str, field_name: str, _format_spec: str, _conversion: str,
                     required: bool, current_base_flag: Flag) -> None:
@@ -232,7 +368,7 @@ def _add_parse_args(literal_text: str, field_name: str, _format_spec: str, _conv
 
 
 def _add_parented_flag(literal_text: str, field_name: str, _format_spec: str, _conversion: str,
-                       flags: Flags, current_base_flag: Union[Flag, None]) -> str:
+                       flags: FlagSet, current_base_flag: Union[Flag, None]) -> str:
     left, _, right = field_name.partition(".")
 
     # determine the parent and child flags
@@ -292,15 +428,15 @@ def _add_extra(literal_text: str, field_name: str, _format_spec: str, _conversio
     return _mangled_fmt(current_base_flag.name, field_name, _format_spec, _conversion)
 
 
-def _add_base_flag(field_name: str, _format_spec: str, _conversion: str, flags: Flags) -> str:
+def _add_base_flag(field_name: str, _format_spec: str, _conversion: str, flags: FlagSet) -> str:
     if field_name not in flags:
         flags.append(Flag(field_name))
     return _default_fmt(field_name, _format_spec, _conversion)
 
 
-def update_fmt(fmt: types.SupportsBracketFormat) -> tuple[Flags, types.SupportsBracketFormat]:
+def update_fmt(fmt: types.SupportsBracketFormat) -> tuple[FlagSet, types.SupportsBracketFormat]:
     data: list[str] = list()
-    flags: Flags = Flags()
+    flags: FlagSet = FlagSet()
     current_base_flag: Flag = None
     for literal_text, field_name, format_spec, conversion in str_formatter.parse(fmt):
         if literal_text:
@@ -345,5 +481,5 @@ def update_fmt(fmt: types.SupportsBracketFormat) -> tuple[Flags, types.SupportsB
         data.append(_add_extra(literal_text, field_name, _format_spec, _conversion,
                                current_base_flag))
     
-    return flags, "".join(data)
+    return flags.freeze(), "".join(data)
         
\ No newline at end of file
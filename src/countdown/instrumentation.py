@@ -0,0 +1,165 @@
+"""MIT License
+
+Copyright (c) 2023-present Tanner B. Corcoran
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+from typing import Union
+import threading
+import time
+import typing
+
+
+OPERATIONS = ("update_fmt", "format", "parse")
+
+
+class OpStats:
+    """Call count, cumulative latency and latency histogram of a single operation. Histogram
+    bucket `i` counts calls that took fewer than `2 ** i` nanoseconds (and at least `2 ** (i-1)`).
+    
+    """
+    __slots__ = ("calls", "failures", "total_ns", "histogram")
+    def __init__(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.total_ns = 0
+        self.histogram: dict[int, int] = {}
+
+    def clear(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.total_ns = 0
+        self.histogram.clear()
+
+    def record(self, elapsed_ns: int, failed: bool = False) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if failed:
+            self.failures += 1
+        bucket = elapsed_ns.bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "total_ns": self.total_ns,
+            "mean_ns": self.mean_ns,
+            "histogram": {1 << bucket: count for bucket, count in sorted(self.histogram.items())}
+        }
+
+
+class Instrumentation:
+    """Opt-in metrics for a single `Countdown` instance: call counts, log2 latency histograms and
+    failure counts for `update_fmt`, `format` and `parse`, plus the render cache statistics. Each
+    item of a batch method such as `Countdown.format_many` or `Countdown.parse_many` counts as one
+    call; items handled in worker processes (`Countdown.format_parallel` with `workers > 1`) are
+    not recorded.
+
+    Pass an instance (or `True`) as `Countdown(..., instrument=...)`. Instances that are not
+    instrumented have no wrapper installed at all, so there is no overhead when disabled. If
+    `callback` is given, it is called as `callback(op, elapsed_ns, failed)` after every call.
+    Recording is serialized with a lock, so an instance may be shared between threads.
+    
+    """
+    __slots__ = ("ops", "callback", "_cache_info", "_lock")
+    def __init__(self, callback: Union[typing.Callable[[str, int, bool], typing.Any], None] = None
+                 ) -> None:
+        self.ops = {op: OpStats() for op in OPERATIONS}
+        self.callback = callback
+        self._cache_info: Union[typing.Callable[[], typing.Any], None] = None
+        self._lock = threading.Lock()
+
+    def record(self, op: str, elapsed_ns: int, failed: bool = False) -> None:
+        with self._lock:
+            self.ops[op].record(elapsed_ns, failed)
+        if self.callback is not None:
+            self.callback(op, elapsed_ns, failed)
+
+    def wrap(self, op: str, func: typing.Callable, failures: tuple[type[BaseException], ...] = ()
+             ) -> typing.Callable:
+        """Return `func` wrapped so that each call is timed and recorded under `op`. Exceptions
+        that are instances of `failures` are counted as failures; all exceptions propagate.
+        
+        """
+        stats = self.ops[op]
+        lock = self._lock
+        perf_counter_ns = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except failures:
+                failed = True
+                raise
+            finally:
+                elapsed = perf_counter_ns() - start
+                with lock:
+                    stats.record(elapsed, failed)
+                if self.callback is not None:
+                    self.callback(op, elapsed, failed)
+
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = getattr(func, "__name__", op)
+        wrapper.__doc__ = getattr(func, "__doc__", None)
+        return wrapper
+
+    def cache_info(self) -> typing.Any:
+        """The render cache statistics of the instrumented `Countdown`, or `None`.
+        
+        """
+        return None if self._cache_info is None else self._cache_info()
+
+    @property
+    def parse_failures(self) -> int:
+        return self.ops["parse"].failures
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        """Export all metrics as plain, JSON-serializable data.
+        
+        """
+        info = self.cache_info()
+        cache = None
+        if info is not None:
+            lookups = info.hits + info.misses
+            cache = info._asdict()
+            cache["hit_rate"] = info.hits / lookups if lookups else 0.0
+        with self._lock:
+            ops = {op: stats.as_dict() for op, stats in self.ops.items()}
+        return {
+            **ops,
+            "parse_failures": ops["parse"]["failures"],
+            "cache": cache
+        }
+
+    def reset(self) -> None:
+        """Reset all operation statistics. The render cache is left untouched.
+        
+        """
+        with self._lock:
+            for stats in self.ops.values():
+                stats.clear()
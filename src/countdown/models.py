@@ -25,32 +25,143 @@ SOFTWARE.
 from typing import Union
 from . import constants
 from . import types
-import plogging
-import logging
+from . import utils
+import functools
+import operator
 import typing
+import array
+
+
+def _component(name: str) -> property:
+    # components are stored in `_{name}` slots so that setting one can reset the cached total
+    slot = f"_{name}"
+    def fset(self: "TimeValue", value: Union[int, float, None]) -> None:
+        setattr(self, slot, value)
+        self._total = None
+    return property(operator.attrgetter(slot), fset)
 
 
 class TimeValue:
     """Stores a time value partitioned into weeks, days, hours, minutes, seconds, milliseconds,
     and/or microseconds.
+
+    The optional `n` component holds nanoseconds (for format strings containing `{n}`); it is
+    floored into `total_microseconds` and exact in `total_nanoseconds`.
+
+    The total number of microseconds is computed on first use and cached (it is reset whenever a
+    component is set). Instances compare and hash by that total, and support `+` and `-` with
+    other instances (or integer microseconds), so `sum()` works directly. The result of an
+    arithmetic operation is split over the units used by either operand.
     
     """
-    _log = plogging.setup_new("TimeValue", level=logging.INFO, package=__name__)
+    _log = utils.LazyLogger("TimeValue", package=__name__)
+    __slots__ = ("_z", "_y", "_M", "_w", "_d", "_h", "_m", "_S", "_s", "_u", "_n", "_total")
+    z = _component("z")
+    y = _component("y")
+    M = _component("M")
+    w = _component("w")
+    d = _component("d")
+    h = _component("h")
+    m = _component("m")
+    S = _component("S")
+    s = _component("s")
+    u = _component("u")
+    n = _component("n")
+
     def __init__(self, z: typing.Literal[1, -1] = 1, y: Union[int, float] = None,
                  M: Union[int, float] = None, w: Union[int, float] = None,
                  d: Union[int, float] = None, h: Union[int, float] = None,
                  m: Union[int, float] = None, S: Union[int, float] = None,
-                 s: Union[int, float] = None, u: Union[int, float] = None) -> None:
-        self.z = z
-        self.y = y
-        self.M = M
-        self.w = w
-        self.d = d
-        self.h = h
-        self.m = m
-        self.S = S
-        self.s = s
-        self.u = u
+                 s: Union[int, float] = None, u: Union[int, float] = None,
+                 n: Union[int, float] = None) -> None:
+        self._z = z
+        self._y = y
+        self._M = M
+        self._w = w
+        self._d = d
+        self._h = h
+        self._m = m
+        self._S = S
+        self._s = s
+        self._u = u
+        self._n = n
+        self._total: Union[int, float, None] = None
+
+    @classmethod
+    def from_microseconds(cls, microseconds: Union[int, float],
+                          units: typing.Iterable[str] = constants.MAP.keys()) -> "TimeValue":
+        """Create a new `TimeValue` by splitting `microseconds` over `units` (any base flag names
+        other than `z`; defaults to all of them). Any remainder below the smallest unit is stored
+        in `u`.
+        
+        """
+        z_flag = 1 if microseconds >= 0 else -1
+        remaining = abs(microseconds)
+        tval = cls(z=z_flag)
+        units = set(units)
+        for name, div in constants.MAP.items():
+            if name in units:
+                value, remaining = divmod(remaining, div)
+                setattr(tval, name, value)
+        if remaining:
+            tval.u = (tval.u or 0) + remaining
+        return tval
+
+    def _units(self) -> set[str]:
+        return {name for name in constants.MAP if getattr(self, name) is not None}
+
+    def __add__(self, other: Union["TimeValue", int]) -> "TimeValue":
+        if isinstance(other, TimeValue):
+            return TimeValue.from_microseconds(self.total_microseconds() +
+                                               other.total_microseconds(),
+                                               self._units() | other._units())
+        if isinstance(other, int):
+            return TimeValue.from_microseconds(self.total_microseconds() + other, self._units())
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Union["TimeValue", int]) -> "TimeValue":
+        if isinstance(other, TimeValue):
+            return TimeValue.from_microseconds(self.total_microseconds() -
+                                               other.total_microseconds(),
+                                               self._units() | other._units())
+        if isinstance(other, int):
+            return TimeValue.from_microseconds(self.total_microseconds() - other, self._units())
+        return NotImplemented
+
+    def __rsub__(self, other: int) -> "TimeValue":
+        if isinstance(other, int):
+            return TimeValue.from_microseconds(other - self.total_microseconds(), self._units())
+        return NotImplemented
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TimeValue):
+            return self.total_microseconds() == other.total_microseconds()
+        return NotImplemented
+
+    def __lt__(self, other: "TimeValue") -> bool:
+        if isinstance(other, TimeValue):
+            return self.total_microseconds() < other.total_microseconds()
+        return NotImplemented
+
+    def __le__(self, other: "TimeValue") -> bool:
+        if isinstance(other, TimeValue):
+            return self.total_microseconds() <= other.total_microseconds()
+        return NotImplemented
+
+    def __gt__(self, other: "TimeValue") -> bool:
+        if isinstance(other, TimeValue):
+            return self.total_microseconds() > other.total_microseconds()
+        return NotImplemented
+
+    def __ge__(self, other: "TimeValue") -> bool:
+        if isinstance(other, TimeValue):
+            return self.total_microseconds() >= other.total_microseconds()
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.total_microseconds())
 
     @typing.overload
     def get(self, name: str, /) -> Union[int, float, None]: ...
@@ -61,12 +172,12 @@ class TimeValue:
         
         """
         if default is types.MISSING:
-            TimeValue._log.debug(f"Acquiring value from flag name: '{name}'")
+            TimeValue._log.debug("Acquiring value from flag name: '%s'", name)
             if name not in constants.BASE_FLAGS:
                 raise ValueError(f"Invalid flag name: '{name}'")
             return getattr(self, name)
         
-        TimeValue._log.debug(f"Acquiring value from flag name: '{name}'; default={default}")
+        TimeValue._log.debug("Acquiring value from flag name: '%s'; default=%s", name, default)
         if name not in constants.BASE_FLAGS:
             return default
         return getattr(self, name)
@@ -119,8 +230,29 @@ class TimeValue:
     def microseconds(self) -> Union[int, float, None]:
         return self.u
 
+    @property
+    def nanoseconds(self) -> Union[int, float, None]:
+        return self.n
+
     def total_microseconds(self) -> int:
-        return sum(map(lambda k, v: (self.get(k) or 0) * v, constants.MAP.keys(), constants.MAP.values())) * self.z
+        total = self._total
+        if total is None:
+            total = ((self.y or 0) * constants.MICROSECONDS_IN_YEAR +
+                     (self.M or 0) * constants.MICROSECONDS_IN_MONTH +
+                     (self.w or 0) * constants.MICROSECONDS_IN_WEEK +
+                     (self.d or 0) * constants.MICROSECONDS_IN_DAY +
+                     (self.h or 0) * constants.MICROSECONDS_IN_HOUR +
+                     (self.m or 0) * constants.MICROSECONDS_IN_MINUTE +
+                     (self.S or 0) * constants.MICROSECONDS_IN_SECOND +
+                     (self.s or 0) * constants.MICROSECONDS_IN_MILLISECOND +
+                     (self.u or 0) +
+                     (self.n or 0) // constants.NANOSECONDS_IN_MICROSECOND) * self.z
+            self._total = total
+        return total
+
+    def total_nanoseconds(self) -> int:
+        return sum((getattr(self, name) or 0) * div
+                   for name, div in constants.NS_MAP.items()) * self.z
 
     def total_milliseconds(self) -> float:
         return self.total_microseconds() / constants.MICROSECONDS_IN_MILLISECOND
@@ -145,3 +277,141 @@ class TimeValue:
     
     def total_years(self) -> float:
         return self.total_microseconds() / constants.MICROSECONDS_IN_YEAR
+
+
+
+class TimeValueBatch:
+    """A columnar container of `TimeValue` components. Each unit in `units` (and the sign) is
+    stored in its own `array.array`, rather than as one object per value. Components must be
+    integers; missing (`None`) components are stored as 0. Nanoseconds (`n`) are only stored if
+    requested in `units`.
+    
+    """
+    __slots__ = ("units", "z", "columns")
+    def __init__(self, units: typing.Iterable[str] = constants.MAP.keys(),
+                 values: typing.Iterable[TimeValue] = ()) -> None:
+        self.units = tuple(name for name in constants.NS_MAP if name in set(units))
+        self.z = array.array("b")
+        self.columns = {name: array.array("q") for name in self.units}
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return len(self.z)
+
+    def append(self, tval: TimeValue) -> None:
+        """Add a `TimeValue` to the end of the batch. A `ValueError` is raised if it has a
+        component for a unit that is not stored by this batch.
+        
+        """
+        for name in constants.NS_MAP:
+            if name not in self.columns and getattr(tval, name):
+                raise ValueError(f"Unit '{name}' is not stored by this batch")
+        self.z.append(tval.z)
+        for name, column in self.columns.items():
+            column.append(getattr(tval, name) or 0)
+
+    def extend(self, values: typing.Iterable[TimeValue]) -> None:
+        for tval in values:
+            self.append(tval)
+
+    def __getitem__(self, index: int) -> TimeValue:
+        tval = TimeValue(z=self.z[index])
+        for name, column in self.columns.items():
+            setattr(tval, name, column[index])
+        return tval
+
+    def __iter__(self) -> typing.Iterator[TimeValue]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def total_microseconds(self) -> array.array:
+        """Return the total microseconds of every value in the batch.
+        
+        """
+        totals = array.array("q", bytes(8 * len(self)))
+        for name, column in self.columns.items():
+            if name == "n":
+                # truncated per value, like `TimeValue.total_microseconds`
+                for index, value in enumerate(column):
+                    totals[index] += value // constants.NANOSECONDS_IN_MICROSECOND
+                continue
+            div = constants.MAP[name]
+            for index, value in enumerate(column):
+                totals[index] += value * div
+        for index, z_flag in enumerate(self.z):
+            if z_flag < 0:
+                totals[index] = -totals[index]
+        return totals
+
+    def sum(self) -> int:
+        """Return the sum of the total microseconds of every value in the batch.
+        
+        """
+        if -1 in self.z or "n" in self.columns:
+            return sum(self.total_microseconds())
+        return sum(constants.MAP[name] * sum(column) for name, column in self.columns.items())
+
+
+class MemoizedDefault:
+    """A callable default that only depends on some components of the `TimeValue` it is called
+    with (see `depends_on`). Results are kept in a bounded, thread-safe LRU cache keyed on those
+    components, and the wrapped function is called with a `TimeValue` that only has those
+    components set, so a component it reads without declaring is always `None`.
+
+    A `Countdown` whose callable defaults are all `MemoizedDefault` instances renders a pure
+    function of its input, so it can use a render cache (see `Countdown(cache_size=...)`).
+    
+    """
+    __slots__ = ("func", "flags", "maxsize", "_cached")
+    def __init__(self, func: typing.Callable[[TimeValue], typing.Any], flags: tuple[str, ...],
+                 maxsize: Union[int, None] = 128) -> None:
+        for name in flags:
+            if name not in constants.BASE_FLAGS:
+                raise ValueError(f"Invalid base flag: '{name}'")
+        self.func = func
+        self.flags = flags
+        self.maxsize = maxsize
+        self._cached = functools.lru_cache(maxsize)(self._call)
+
+    def _call(self, *values: Union[int, float, None]) -> typing.Any:
+        return self.func(TimeValue(**dict(zip(self.flags, values))))
+
+    def __call__(self, tval: TimeValue) -> typing.Any:
+        return self._cached(*[getattr(tval, name) for name in self.flags])
+
+    def __reduce__(self) -> tuple[type, tuple]:
+        # the cache is not carried over
+        return (MemoizedDefault, (self.func, self.flags, self.maxsize))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.func!r}, flags={self.flags!r})"
+
+    def cache_info(self) -> typing.Any:
+        """The `functools.lru_cache` statistics of the memoized results.
+        
+        """
+        return self._cached.cache_info()
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+
+
+def depends_on(*flags: str, maxsize: Union[int, None] = 128
+               ) -> typing.Callable[[typing.Callable[[TimeValue], typing.Any]], MemoizedDefault]:
+    """Declare the base flags (such as `"S"` or `"z"`) that a callable default reads, so that its
+    results are memoized on just those component values, in an LRU cache of up to `maxsize`
+    entries (unbounded if `None`).
+
+    Example Usage
+    -------------
+    ```
+    >>> @depends_on("S")
+    ... def seconds_suffix(tval):
+    ...     return " second" if tval.S == 1 else " seconds"
+    >>> Countdown("{S}{Sd}", Sd=seconds_suffix)
+    ```
+    
+    """
+    def decorator(func: typing.Callable[[TimeValue], typing.Any]) -> MemoizedDefault:
+        return MemoizedDefault(func, flags, maxsize)
+    return decorator
@@ -21,8 +21,15 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 
 """
+from typing import Union
 from . import types
+import threading
 import typing
+import sys
+
+if typing.TYPE_CHECKING:
+    import datetime
+    import logging
 
 
 class StaticProperty(typing.Generic[types.T]):
@@ -49,3 +56,89 @@ class StaticProperty(typing.Generic[types.T]):
 
     def __get__(self, inst, owner) -> types.T:
         return self.func()
+
+
+class CachedStaticProperty(StaticProperty[types.T]):
+    """Same as `StaticProperty`, but the decorated function is only called on the first access;
+    the result is cached and returned on every subsequent access. The function is called at most
+    once, even if first accessed from several threads at the same time.
+    
+    """
+    def __init__(self, func: typing.Callable[[], types.T]) -> None:
+        super().__init__(func)
+        self._value: Union[types.T, type[types.MISSING]] = types.MISSING
+        self._lock = threading.Lock()
+
+    def __get__(self, inst, owner) -> types.T:
+        value = self._value
+        if value is types.MISSING:
+            with self._lock:
+                value = self._value
+                if value is types.MISSING:
+                    value = self._value = self.func()
+        return value
+
+
+def timedelta_to_microseconds(td: "datetime.timedelta") -> int:
+    """The exact number of microseconds in `td`, computed with integer arithmetic (unlike
+    `td.total_seconds() * 1_000_000`, which loses precision for long durations).
+    
+    """
+    return (td.days * 86_400 + td.seconds) * 1_000_000 + td.microseconds
+
+
+def is_callable_default(obj: typing.Any) -> bool:
+    """Whether a default passed to `Countdown` is called with the `TimeValue` being formatted
+    rather than used as a static value. Any callable qualifies: functions, builtins, bound
+    methods, `functools.partial` objects, `models.MemoizedDefault` and other instances defining
+    `__call__`.
+    
+    """
+    return callable(obj)
+
+
+class LazyLogger:
+    """A stand-in for a `plogging` logger that defers importing `plogging` (and `logging`) until
+    the logger is actually used. Attribute access other than `.debug` (e.g. `.setLevel`) creates
+    the real logger, set up as `plogging.setup_new(name, level=INFO, package=package)`.
+
+    `.debug` is a no-op until the real logger exists, since a freshly set up logger would drop
+    debug records anyway. A logger that was already configured through `logging.getLogger` under
+    the same name is picked up (keeping its level) on the next `.debug` call.
+    
+    """
+    __slots__ = ("name", "package", "qualname", "_logger")
+    def __init__(self, name: str, package: str = None) -> None:
+        self.name = name
+        self.package = package
+        self.qualname = f"{package}.{name}" if package else name
+        self._logger: Union["logging.Logger", None] = None
+
+    @property
+    def logger(self) -> "logging.Logger":
+        """The underlying logger, which is created on first access.
+        
+        """
+        if self._logger is None:
+            import logging
+            import plogging
+            existing = logging.Logger.manager.loggerDict.get(self.qualname)
+            level = logging.INFO
+            if isinstance(existing, logging.Logger) and existing.level != logging.NOTSET:
+                level = existing.level
+            self._logger = plogging.setup_new(self.name, level=level, package=self.package)
+        return self._logger
+
+    def debug(self, msg: str, *args, **kwargs) -> None:
+        logger = self._logger
+        if logger is None:
+            logging = sys.modules.get("logging")
+            if logging is None or self.qualname not in logging.Logger.manager.loggerDict:
+                return
+            logger = self.logger
+        logger.debug(msg, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> typing.Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.logger, name)
@@ -6,6 +6,15 @@ sys.path.append(".")
 from src import countdown
 import datetime
 import unittest
+import asyncio
+import random
+import time
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 cd = countdown.Countdown(
     "T{z}{y.Ea}{y}[_]{Eb}{M}{Ec}{p}{w}{Ed}{P}{d}{Ee}{ep}{h}{Ef}{eP}{m}{Eg}{Ep}{S}{Eh}{EP}{s}{Ei}"
@@ -83,5 +92,983 @@ class TestCountdown(unittest.TestCase):
                                                        seconds=1, milliseconds=1, microseconds=1))
         self.assertEqual(value, "T+[_]1[w]1[d]23[h]eS1[m]1[s]1[ms]1[microseconds]")
 
+class TestRenderPlan(unittest.TestCase):
+    def assert_matches_uncompiled(self, cd2: countdown.Countdown) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            value = rng.choice([rng.randint(-10 ** 18, 10 ** 18), rng.randint(-10 ** 8, 10 ** 8),
+                                rng.randint(-2, 2), rng.uniform(-1e12, 1e12)])
+            self.assertEqual(cd2.format(value), cd2._format_uncompiled(value))
+
+    def test_compiled(self) -> None:
+        self.assertIsNotNone(cd.plan)
+        self.assertIsNotNone(countdown.Countdown.default.plan)
+
+    def test_matches_uncompiled(self) -> None:
+        self.assert_matches_uncompiled(cd)
+        self.assert_matches_uncompiled(countdown.Countdown.default)
+
+    def test_matches_uncompiled_options(self) -> None:
+        cd2 = countdown.Countdown("{z}{d:>4}{dd!r} {h}{p} {m:03}{mm}{S}", dd="d",
+                                  mm=lambda tval: tval.m * 2, remove_empty=False, max_value=50,
+                                  strip_output=False)
+        self.assertIsNotNone(cd2.plan)
+        self.assert_matches_uncompiled(cd2)
+
+    def test_uncompilable_falls_back(self) -> None:
+        cd2 = countdown.Countdown("{S}{_x}")
+        self.assertIsNone(cd2.plan)
+        self.assertRaises(KeyError, cd2.format, 1)
+
+
+class TestParseCache(unittest.TestCase):
+    def test_compile_parser_is_cached(self) -> None:
+        cd2 = countdown.Countdown(cd.orig_fmt, **cd._defaults)
+        self.assertIs(cd2.compile_parser(), cd2.compile_parser())
+        self.assertIs(cd2.compile_parser(), cd.compile_parser())
+
+    def test_cache_keyed_on_defaults(self) -> None:
+        cd2 = countdown.Countdown("{S}{Sd}", Sd="s")
+        cd3 = countdown.Countdown("{S}{Sd}", Sd="sec")
+        self.assertIsNot(cd2.compile_parser(), cd3.compile_parser())
+        self.assertEqual(cd2.parse("5s").total_seconds(), 5)
+        self.assertEqual(cd3.parse("5sec").total_seconds(), 5)
+
+
+class TestStrictParse(unittest.TestCase):
+    def test_parse(self) -> None:
+        value = cd.parse("T+[YL]3969[_][YR]1[mo]4[w]S1[h]22[m]Es3[s]ES456[ms]789[microseconds]",
+                         strict=True)
+        self.assertEqual(value.total_microseconds(), 123456792123456789)
+
+    def test_removed_empty(self) -> None:
+        value = cd.parse("T-[_]1[m]26[s]ES400[ms]1[microseconds]", strict=True)
+        self.assertEqual(value.total_microseconds(), -86400001)
+        self.assertEqual(value.y, 0)
+
+    def test_plurals(self) -> None:
+        cd2 = countdown.Countdown("{h}{hd}{p} {m}{md}{p}", hd=" hour", md=" minute")
+        self.assertEqual(cd2.parse("1 hour 2 minutes", strict=True).total_minutes(), 62)
+        self.assertEqual(cd2.parse("2 hours", strict=True).total_minutes(), 120)
+
+    def test_round_trip(self) -> None:
+        rng = random.Random(0)
+        for cd2 in (cd, countdown.Countdown.default):
+            for _ in range(1000):
+                value = rng.randint(-10 ** 17, 10 ** 17)
+                formatted = cd2.format(value)
+                self.assertEqual(cd2.format(cd2.parse(formatted, strict=True).total_microseconds()),
+                                 formatted)
+
+    def test_mismatch(self) -> None:
+        self.assertRaises(countdown.exceptions.ParseError, cd.parse, "T+[_]1[d]extra",
+                          strict=True)
+
+
+class TestFormatMany(unittest.TestCase):
+    def test_format_many(self) -> None:
+        values = [123456792123456789, -86400001, 0, 1]
+        self.assertEqual(cd.format_many(values), [cd.format(v) for v in values])
+
+    def test_iformat_is_lazy(self) -> None:
+        results = cd.iformat(iter([1, "bad"]))
+        self.assertEqual(next(results), "T+[_]1[microseconds]")
+        self.assertRaises(TypeError, next, results)
+
+    def test_units(self) -> None:
+        self.assertEqual(cd.format_many([-1, datetime.timedelta(days=-1)], unit="days"),
+                         ["T-[_]1[d]", "T-[_]1[d]"])
+        self.assertEqual(cd.format_many([86400.0001], unit="seconds"),
+                         [cd.format_seconds(86400.0001)])
+        self.assertRaises(ValueError, cd.format_many, [1], unit="fortnights")
+
+    def test_ignore(self) -> None:
+        def fail(tval: countdown.TimeValue) -> str:
+            raise RuntimeError
+        cd2 = countdown.Countdown("{S}{Sd}", Sd=fail)
+        self.assertEqual(cd2.format_many([10 ** 6], ignore=True),
+                         [cd2.format(10 ** 6, ignore=True)])
+        self.assertRaises(RuntimeError, cd2.format_many, [10 ** 6])
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_cache(self) -> None:
+        cd2 = countdown.Countdown("{z}{m}:{S}", cache_size=2)
+        self.assertEqual(cd2.format(61_000_001), "+1:1")
+        self.assertEqual(cd2.format(61_999_999), "+1:1")
+        self.assertEqual(cd2.format(-61_000_000), "-1:1")
+        self.assertEqual(cd2.format(-100), "-:")
+        self.assertEqual(cd2.format(100), "+:")
+        self.assertEqual(tuple(cd2.cache_info()), (1, 4, 2, 2))
+        cd2.cache_clear()
+        self.assertEqual(tuple(cd2.cache_info()), (0, 0, 2, 0))
+
+    def test_invalid_size(self) -> None:
+        with self.assertRaises(ValueError):
+            countdown.Countdown("{S}", cache_size=-5)
+        self.assertIsNone(countdown.Countdown("{S}", cache_size=0).cache_info())
+
+    def test_matches_uncached(self) -> None:
+        rng = random.Random(0)
+        cd2 = countdown.Countdown("{M}{Md} {w}{wd}", Md="mo", wd="w", cache_size=16)
+        for _ in range(1000):
+            value = rng.randint(0, 10 ** 14)
+            self.assertEqual(cd2.format(value), cd2._format_uncompiled(value))
+
+    def test_disabled(self) -> None:
+        self.assertIsNone(cd.cache_info())
+        cd2 = countdown.Countdown("{S}{Sd}", Sd=lambda tval: tval.S, cache_size=16)
+        self.assertIsNone(cd2.cache_info())
+
+
+class TestTicker(unittest.TestCase):
+    def test_decomposition(self) -> None:
+        from src.countdown import _ticker
+        rng = random.Random(0)
+        for cd2 in (cd, countdown.Countdown("{M}{Md} {w}{wd} {d}", Md="mo", wd="w")):
+            for _ in range(100):
+                remaining = rng.randint(0, 10 ** 15)
+                state = _ticker.Decomposition(cd2.plan, remaining)
+                for _ in range(50):
+                    step = min(remaining, rng.choice([1, 10 ** 6, rng.randint(0, remaining)]))
+                    remaining -= step
+                    state.subtract(step)
+                    self.assertEqual(tuple(state.values), cd2.plan.decompose(remaining)[1])
+
+    def test_ticker(self) -> None:
+        cd2 = countdown.Countdown("{S}.{s:03}", remove_empty=False)
+        ticks = list(cd2.ticker(time.time() + 0.12, 50_000))
+        self.assertEqual(ticks[1:], ["0.100", "0.050", "0.000"])
+
+    def test_async_ticker(self) -> None:
+        cd2 = countdown.Countdown("{S}.{s:03}{sd}", remove_empty=False, sd=lambda tval: "!")
+
+        async def collect() -> list[str]:
+            step = datetime.timedelta(milliseconds=50)
+            return [text async for text in cd2.ticker(time.time() + 0.12, step)]
+
+        self.assertEqual(asyncio.run(collect())[1:], ["0.100!", "0.050!", "0.000!"])
+
+    def test_expired(self) -> None:
+        self.assertEqual(list(cd.ticker(datetime.datetime(2000, 1, 1))), ["T+[_]"])
+
+
+class TestNextChange(unittest.TestCase):
+    def assert_next_change(self, cd2: countdown.Countdown, value: int, expected: int) -> None:
+        delta = cd2.next_change(value)
+        self.assertEqual(delta, expected)
+        if delta is not None:
+            self.assertEqual(cd2.format(value - delta + 1), cd2.format(value))
+            self.assertNotEqual(cd2.format(value - delta), cd2.format(value))
+
+    def test_smallest_unit(self) -> None:
+        cd2 = countdown.Countdown("{m}:{S}")
+        self.assert_next_change(cd2, 61_500_000, 500_001)
+        self.assert_next_change(cd2, 61_000_000, 1)
+        self.assert_next_change(cd2, 0, 1_000_000)
+        self.assert_next_change(cd2, -1, 999_999)
+        self.assert_next_change(countdown.Countdown("{z}{m}:{S}"), 0, 1)
+
+    def test_max_value(self) -> None:
+        cd2 = countdown.Countdown("{z}{m}m {S}s", max_value=3)
+        self.assert_next_change(cd2, 3_600_000_000, 3_600_000_000 - 183_000_000 + 1)
+        self.assertIsNone(cd2.next_change(-3_600_000_000))
+
+    def test_static_only_unit(self) -> None:
+        cd2 = countdown.Countdown("x{S.Sd}{S.p}", Sd="S", remove_empty=False)
+        self.assert_next_change(cd2, 10 ** 15, 10 ** 15 - 2_000_000 + 1)
+        cd3 = countdown.Countdown("x{S.Sd}", Sd="S")
+        self.assert_next_change(cd3, 10 ** 15, 10 ** 15 - 1_000_000 + 1)
+
+    def test_callable_reads_other_unit(self) -> None:
+        cd2 = countdown.Countdown("{m}{md} {S.Sd}", md=lambda t: f"<{t.S}>", Sd="s")
+        self.assert_next_change(cd2, 74_488_524, 488_525)
+        cd3 = countdown.Countdown("{m}{md} {S.Sd}", md=countdown.depends_on("m")(lambda t: "m"),
+                                  Sd="s")
+        self.assert_next_change(cd3, 74_488_524, 13_488_525)
+        cd4 = countdown.Countdown("{m}{md} {S.Sd}", Sd="s",
+                                  md=countdown.depends_on("S")(lambda t: f"<{t.S}>"))
+        self.assert_next_change(cd4, 74_488_524, 488_525)
+
+    def test_random(self) -> None:
+        rng = random.Random(0)
+        for cd2 in (cd, countdown.Countdown.default,
+                    countdown.Countdown("{z}{M}{Md} {w}{wd}", Md="mo", wd="w", max_value=2)):
+            for _ in range(200):
+                value = rng.randint(-10 ** 15, 10 ** 15)
+                delta = cd2.next_change(value)
+                if delta is None:
+                    continue
+                self.assertEqual(cd2.format(value - delta + 1), cd2.format(value))
+                self.assertNotEqual(cd2.format(value - delta), cd2.format(value))
+
+
+class TestScheduler(unittest.TestCase):
+    def test_run_pending(self) -> None:
+        scheduler = countdown.CountdownScheduler(countdown.Countdown("{m}:{S}",
+                                                                     remove_empty=False))
+        events = []
+        start = 1_700_000_000_000_000
+        scheduler.add(start / 10 ** 6 + 3, events.append, lambda: events.append("a done"))
+        b = scheduler.add(start / 10 ** 6 + 1.5, lambda text: events.append(f"b {text}"))
+        c = scheduler.add(start / 10 ** 6 + 5, lambda text: events.append(f"c {text}"))
+        c.cancel()
+        wakes = []
+        now = start
+        while now != -1:
+            now = scheduler.run_pending(now)
+            wakes.append(now - start if now != -1 else None)
+        self.assertEqual(events, ["0:3", "b 0:1", "0:2", "b 0:0", "0:1", "0:0", "a done"])
+        self.assertEqual(wakes, [1, 500_001, 1_000_001, 1_500_000, 2_000_001, 3_000_000, None])
+        self.assertTrue(b.expired)
+        self.assertEqual(b.text, "0:0")
+
+    def test_run(self) -> None:
+        scheduler = countdown.CountdownScheduler(countdown.Countdown("{s}", remove_empty=False))
+        events = []
+        for i in range(100):
+            scheduler.add(time.time() + 0.002 + i * 0.0001, events.append)
+        asyncio.run(scheduler.run(until_empty=True))
+        self.assertEqual(len(scheduler), 0)
+        self.assertEqual(events.count("0"), 100)
+
+    def test_callback_errors(self) -> None:
+        errors = []
+        scheduler = countdown.CountdownScheduler(
+            countdown.Countdown("{S}", remove_empty=False),
+            on_error=lambda entry, exc: errors.append((entry, type(exc))))
+        events = []
+
+        def fail(text: str) -> None:
+            raise ZeroDivisionError
+
+        async def fail_async(text: str) -> None:
+            raise KeyError
+
+        start = 1_700_000_000_000_000
+        a = scheduler.add(start / 10 ** 6 + 2, fail, lambda: events.append("a done"))
+        b = scheduler.add(start / 10 ** 6 + 2, events.append)
+        now = start
+        while now != -1:
+            now = scheduler.run_pending(now)
+        self.assertEqual(events, ["2", "1", "0", "a done"])
+        self.assertEqual(errors, [(a, ZeroDivisionError)] * 3)
+        self.assertTrue(a.expired and b.expired)
+
+        errors.clear()
+
+        async def main() -> None:
+            c = scheduler.add(time.time() + 0.002, fail_async)
+            await scheduler.run(until_empty=True)
+            await asyncio.sleep(0)
+            self.assertEqual(errors, [(c, KeyError)])
+            self.assertEqual(len(scheduler._tasks), 0)
+
+        asyncio.run(main())
+
+
+class TestDeadlineBoard(unittest.TestCase):
+    def test_board(self) -> None:
+        start = 1_700_000_000_000_000
+        board = countdown.DeadlineBoard(countdown.Countdown("{m}:{S}", remove_empty=False),
+                                        {"a": start / 10 ** 6 + 30, "b": start / 10 ** 6 + 5})
+        board.add("c", start / 10 ** 6 + 90)
+        board.update([("d", start / 10 ** 6 - 1), ("a", start / 10 ** 6 + 60)])
+        self.assertEqual(list(board), ["d", "b", "a", "c"])
+        self.assertEqual(board.deadline("a"), start + 60_000_000)
+        self.assertEqual(board.render(now=start),
+                         [("d", "0:0"), ("b", "0:5"), ("a", "1:0"), ("c", "1:30")])
+        self.assertEqual(board.render(1, 3, now=start), [("b", "0:5"), ("a", "1:0")])
+        self.assertEqual(board.expiring_within(60, now=start), ["b", "a"])
+        self.assertEqual(board.render_within(59, now=start), [("b", "0:5")])
+        self.assertEqual(board.expired(now=start + 5_000_000), ["d", "b"])
+        self.assertEqual(board.evict_expired(now=start + 5_000_000), ["d", "b"])
+        self.assertEqual(board.items(), [("a", start + 60_000_000), ("c", start + 90_000_000)])
+        self.assertNotIn("b", board)
+        board.remove("a")
+        board.discard("a")
+        self.assertEqual(len(board), 1)
+        with self.assertRaises(KeyError):
+            board.remove("a")
+
+    def test_ties(self) -> None:
+        rng = random.Random(0)
+        board = countdown.DeadlineBoard(countdown.Countdown.default)
+        expected = {}
+        for _ in range(2_000):
+            key = rng.randrange(300)
+            if rng.random() < 0.2:
+                board.discard(key)
+                expected.pop(key, None)
+            else:
+                expected[key] = rng.randrange(50)
+                board.add(key, expected[key])
+        self.assertEqual(dict(board.items()), {k: v * 10 ** 6 for k, v in expected.items()})
+        self.assertEqual([d for _, d in board.items()], sorted(d for _, d in board.items()))
+
+
+class TestThreadSafety(unittest.TestCase):
+    def test_frozen_template(self) -> None:
+        cd2 = countdown.Countdown("{m}{md} {S} {s.ms}", md="m", ms="ms")
+        with self.assertRaises(AttributeError):
+            cd2.plan.max_value = 3
+        with self.assertRaises(AttributeError):
+            cd2.plan.units[0].divisor = 1
+        with self.assertRaises(AttributeError):
+            del cd2.plan.pieces
+        with self.assertRaises(AttributeError):
+            cd2.compile_parser(True).plus = "+"
+        with self.assertRaises(TypeError):
+            cd2.flags.append(countdown.formatter.Flag("h"))
+        self.assertEqual(cd2.flags["s"].extras, frozenset({"ms"}))
+        self.assertIsInstance(cd2.flags["m"].parse_args, tuple)
+        self.assertTrue(cd2.flags["m"].parse_args_locked)
+
+    def test_cache_stripes(self) -> None:
+        cd2 = countdown.Countdown("{h}:{m}:{S}", cache_size=4096)
+        for value in range(10_000):
+            cd2.format(value * 1_000_000)
+        self.assertEqual(tuple(cd2.cache_info()), (0, 10_000, 4096, 4096))
+        cd2.format(9_999_000_000)
+        self.assertEqual(cd2.cache_info().hits, 1)
+
+    def test_shared_countdown(self) -> None:
+        import concurrent.futures
+        cd2 = countdown.Countdown("{h}{hd} {m}{md} {S}{Sd}", hd="h", md="m", Sd="s",
+                                  cache_size=256)
+        rng = random.Random(0)
+        values = [rng.randrange(0, 10 ** 10, 1_000_000) for _ in range(3_000)]
+        expected = [cd2._format_uncompiled(value) for value in values]
+
+        def work(offset: int) -> bool:
+            order = list(range(offset, len(values))) + list(range(offset))
+            for i in order:
+                text = cd2.format(values[i])
+                if text != expected[i]:
+                    return False
+                if i % 50 == 0 and cd2.parse(text, strict=i % 100 == 0).total_microseconds() \
+                        != values[i]:
+                    return False
+            return True
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(work, range(0, 3_000, 375)))
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(results, [True] * 8)
+        info = cd2.cache_info()
+        self.assertLessEqual(info.currsize, 256)
+        self.assertLessEqual(info.hits + info.misses, 8 * 3_000)
+
+
+class TestCallableDefaults(unittest.TestCase):
+    def test_callables(self) -> None:
+        import functools
+        import operator
+
+        class Suffix:
+            def __init__(self, text: str) -> None:
+                self.text = text
+
+            def get(self, tval: countdown.TimeValue) -> str:
+                return self.text * tval.S
+
+        for default, expected in ((functools.partial(lambda c, tval: c * tval.S, "!"), "3!!!"),
+                                  (Suffix("?").get, "3???"),
+                                  ("[{0.S}]".format, "3[3]"),
+                                  (operator.attrgetter("S"), "33"),
+                                  ("static", "3static")):
+            cd2 = countdown.Countdown("{S}{Sd}", Sd=default)
+            self.assertEqual(cd2.format(3_000_000), expected)
+            self.assertEqual(cd2._format_uncompiled(3_000_000), expected)
+
+    def test_depends_on(self) -> None:
+        calls = []
+
+        @countdown.depends_on("S", "z")
+        def suffix(tval: countdown.TimeValue) -> str:
+            calls.append(tval.S)
+            return f"{'-' if tval.z < 0 else ''}{tval.S}{tval.m}"
+
+        cd2 = countdown.Countdown("{m}:{S} {S.Sd}", remove_empty=False, Sd=suffix)
+        self.assertEqual(cd2.format(61_000_000), "1:1 1None")
+        self.assertEqual(cd2.format(121_000_000), "2:1 1None")
+        self.assertEqual(cd2.format(-1_000_000), "0:1 -1None")
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(suffix.cache_info().hits, 1)
+        self.assertEqual(cd2._format_uncompiled(181_000_000), "3:1 1None")
+        self.assertEqual(calls, [1, 1])
+        # memoized defaults are pure, so the render cache can be used
+        self.assertIsNotNone(countdown.Countdown("{S}{Sd}", Sd=suffix, cache_size=8).cache_info())
+        self.assertIsNone(countdown.Countdown("{S}{Sd}", Sd=_seconds_suffix,
+                                              cache_size=8).cache_info())
+        with self.assertRaises(ValueError):
+            countdown.depends_on("x")(_seconds_suffix)
+
+    def test_ignore_not_cached(self) -> None:
+        @countdown.depends_on("S")
+        def fails(tval: countdown.TimeValue) -> str:
+            if tval.S == 1:
+                raise ZeroDivisionError
+            return "s"
+
+        cd2 = countdown.Countdown("{S}{Sd}", Sd=fails, cache_size=8)
+        self.assertEqual(cd2.format(1_000_000, ignore=True), f"1{fails}")
+        with self.assertRaises(ZeroDivisionError):
+            cd2.format(1_000_000)
+        self.assertEqual(cd2.format(2_000_000), "2s")
+        self.assertEqual(cd2.format(2_000_000, ignore=True), "2s")
+        self.assertEqual(cd2.cache_info().hits, 1)
+
+    def test_pickle(self) -> None:
+        import pickle
+        cd2 = countdown.Countdown("{S}{Sd}", Sd=countdown.depends_on("S")(_seconds_suffix))
+        clone = pickle.loads(pickle.dumps(cd2))
+        self.assertEqual(clone.format(1_000_000), "1 second")
+        self.assertEqual(clone.format(2_000_000), "2s")
+
+
+class TestTimeValue(unittest.TestCase):
+    def test_total_cache_reset(self) -> None:
+        tval = countdown.TimeValue(S=5, u=3)
+        self.assertEqual(tval.total_microseconds(), 5_000_003)
+        tval.S = 6
+        self.assertEqual(tval.total_microseconds(), 6_000_003)
+        tval.set("z", -1)
+        self.assertEqual(tval.total_microseconds(), -6_000_003)
+
+    def test_arithmetic(self) -> None:
+        a = countdown.TimeValue(S=5, u=3)
+        b = countdown.TimeValue(z=-1, m=1)
+        self.assertEqual((a + b).total_microseconds(), -54_999_997)
+        self.assertEqual((b - a).m, 1)
+        self.assertEqual((b - a).S, 5)
+        self.assertEqual((b - a).z, -1)
+        self.assertEqual((a + 7).u, 10)
+        self.assertEqual(sum([a, b, a]).total_microseconds(), -49_999_994)
+
+    def test_comparison(self) -> None:
+        a = countdown.TimeValue(m=1)
+        b = countdown.TimeValue(S=60)
+        self.assertEqual(a, b)
+        self.assertEqual(len({a, b}), 1)
+        self.assertLess(countdown.TimeValue(S=59), a)
+        self.assertGreater(a, countdown.TimeValue(z=-1, h=1))
+
+    def test_no_dict(self) -> None:
+        self.assertFalse(hasattr(countdown.TimeValue(), "__dict__"))
+
+    def test_batch(self) -> None:
+        tvals = [countdown.TimeValue(h=1, S=2), countdown.TimeValue(z=-1, m=3)]
+        batch = countdown.TimeValueBatch("hmS", tvals)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(list(batch.total_microseconds()), [3_602_000_000, -180_000_000])
+        self.assertEqual(batch.sum(), 3_422_000_000)
+        self.assertEqual(batch[1], tvals[1])
+        self.assertEqual(list(batch), tvals)
+        self.assertRaises(ValueError, batch.append, countdown.TimeValue(d=1))
+
+    def test_batch_nanoseconds(self) -> None:
+        tvals = [countdown.TimeValue(S=1, n=5), countdown.TimeValue(z=-1, u=2, n=1_999)]
+        batch = countdown.TimeValueBatch("Sun", tvals)
+        self.assertEqual(list(batch), tvals)
+        self.assertEqual([tval.n for tval in batch], [5, 1_999])
+        self.assertEqual(list(batch.total_microseconds()),
+                         [tval.total_microseconds() for tval in tvals])
+        self.assertEqual(batch.sum(), 999_997)
+        self.assertRaises(ValueError, countdown.TimeValueBatch().append, tvals[0])
+
+
+class TestParseMany(unittest.TestCase):
+    lines = ["T+[YL]3969[_][YR]1[mo]4[w]S1[h]22[m]Es3[s]ES456[ms]789[microseconds]\n",
+             "T-[_]1[m]26[s]ES400[ms]1[microseconds]\r\n"]
+
+    def test_parse_many(self) -> None:
+        values = [tval.total_microseconds() for tval in cd.parse_many(self.lines)]
+        self.assertEqual(values, [123456792123456789, -86400001])
+
+    def test_as_int(self) -> None:
+        for strict in (False, True):
+            values = list(cd.parse_many(iter(self.lines), as_int=True, strict=strict))
+            self.assertEqual(values, [123456792123456789, -86400001])
+
+    def test_bytes(self) -> None:
+        values = list(cd.parse_many([line.encode() for line in self.lines], as_int=True))
+        self.assertEqual(values, [123456792123456789, -86400001])
+
+    def test_errors(self) -> None:
+        lines = [self.lines[0], "garbage", self.lines[1]]
+        self.assertRaises(countdown.exceptions.ParseError, list,
+                          cd.parse_many(lines, strict=True))
+        self.assertEqual(list(cd.parse_many(lines, strict=True, as_int=True, errors="skip")),
+                         [123456792123456789, -86400001])
+        self.assertEqual(list(cd.parse_many(lines, strict=True, as_int=True, errors="sentinel",
+                                            sentinel=-1)),
+                         [123456792123456789, -1, -86400001])
+        self.assertRaises(ValueError, list, cd.parse_many(lines, errors="ignore"))
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestArrays(unittest.TestCase):
+    def test_decompose_array(self) -> None:
+        columns = cd.decompose_array(numpy.array([123456792123456789, -86400001]))
+        self.assertEqual(columns["z"].tolist(), [1, -1])
+        self.assertEqual(columns["y"].tolist(), [3969, 0])
+        self.assertEqual(columns["s"].tolist(), [456, 400])
+
+    def test_decompose_array_max_value(self) -> None:
+        cd2 = countdown.Countdown("{m}:{S}", max_value=59)
+        columns = cd2.decompose_array([3600 * 10 ** 6 + 1])
+        self.assertEqual(columns["m"].tolist(), [59])
+        self.assertEqual(columns["S"].tolist(), [59])
+
+    def test_format_array(self) -> None:
+        rng = random.Random(0)
+        values = [rng.randint(-10 ** 17, 10 ** 17) for _ in range(1000)] + [0, 1, -1, 2]
+        for cd2 in (cd, countdown.Countdown.default,
+                    countdown.Countdown("{z}{d:>4}{dd!r} {h}{p} {m:03}:{S}", dd="d",
+                                        max_value=50, remove_empty=False)):
+            self.assertEqual(cd2.format_array(numpy.array(values)).tolist(),
+                             [cd2.format(v) for v in values])
+
+    def test_format_array_callable(self) -> None:
+        cd2 = countdown.Countdown("{m}:{S}{Sd}", Sd=lambda tval: "!" * tval.S)
+        self.assertEqual(cd2.format_array(numpy.array([[2000000], [61000000]])).tolist(),
+                         [[":2!!"], ["1:1!"]])
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_disabled(self) -> None:
+        self.assertIsNone(cd.instrumentation)
+        self.assertNotIn("format", vars(cd))
+
+    def test_metrics(self) -> None:
+        calls = []
+        instr = countdown.Instrumentation(lambda op, ns, failed: calls.append((op, failed)))
+        cd2 = countdown.Countdown("{m}:{S}", cache_size=4, instrument=instr)
+        self.assertIs(cd2.instrumentation, instr)
+        self.assertEqual(cd2.format(61_000_000), "1:1")
+        self.assertEqual(cd2.format_seconds(61), "1:1")
+        self.assertEqual(cd2.parse("2:3", strict=True).S, 3)
+        with self.assertRaises(countdown.exceptions.ParseError):
+            cd2.parse("x", strict=True)
+        metrics = instr.as_dict()
+        self.assertEqual(metrics["update_fmt"]["calls"], 1)
+        self.assertEqual(metrics["format"]["calls"], 2)
+        self.assertEqual(metrics["parse"]["calls"], 2)
+        self.assertEqual(metrics["parse_failures"], 1)
+        self.assertEqual(sum(metrics["format"]["histogram"].values()), 2)
+        self.assertEqual(metrics["cache"]["hits"], 1)
+        self.assertEqual(metrics["cache"]["hit_rate"], 0.5)
+        self.assertEqual(calls, [("update_fmt", False), ("format", False), ("format", False),
+                                 ("parse", False), ("parse", True)])
+        instr.reset()
+        cd2.format(0)
+        self.assertEqual(cd2.format_microseconds(61_000_000), "1:1")
+        self.assertEqual(instr.as_dict()["format"]["calls"], 2)
+
+    def test_batch_metrics(self) -> None:
+        instr = countdown.Instrumentation()
+        cd2 = countdown.Countdown("{m}:{S}", instrument=instr)
+        self.assertEqual(cd2.format_many([61_000_000, 62_000_000]), ["1:1", "1:2"])
+        self.assertEqual(list(cd2.format_parallel([63_000_000], workers=1)), ["1:3"])
+        cd2.format_many_into([0], bytearray())
+        parsed = list(cd2.parse_many(["1:2", "x", "3:4"], strict=True, errors="skip"))
+        self.assertEqual(len(parsed), 2)
+        metrics = instr.as_dict()
+        self.assertEqual(metrics["format"]["calls"], 4)
+        self.assertEqual(metrics["parse"]["calls"], 3)
+        self.assertEqual(metrics["parse_failures"], 1)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_lazy_modules(self) -> None:
+        from benchmarks import bench_import
+        self.assertEqual(bench_import.lazy_modules_imported(), [])
+
+    def test_budget(self) -> None:
+        from benchmarks import bench_import
+        bench_import.check()
+
+    def test_lazy_logger(self) -> None:
+        import logging
+        log = countdown.utils.LazyLogger("TestLazyLogger", package="countdown.tests")
+        log.debug("not created: %s", 1)
+        self.assertIsNone(log._logger)
+        logging.getLogger("countdown.tests.TestLazyLogger").setLevel(logging.DEBUG)
+        with self.assertLogs("countdown.tests.TestLazyLogger", logging.DEBUG) as logs:
+            log.debug("created: %s", 2)
+        self.assertEqual(logs.records[0].getMessage(), "created: 2")
+        self.assertEqual(log.level, logging.DEBUG)
+
+
+class TestBench(unittest.TestCase):
+    def test_compare(self) -> None:
+        from src.countdown import bench
+        baseline = {"a": 100.0, "b": 100.0, "c": 0.0}
+        self.assertEqual(bench.compare(baseline, {"a": 110.0, "b": 130.0, "c": 5.0, "d": 1.0}),
+                         [("b", 100.0, 130.0, 1.3)])
+        self.assertEqual(bench.compare(baseline, {"b": 130.0}, threshold=0.5), [])
+
+    def test_run(self) -> None:
+        from src.countdown import bench
+        results = bench.run(number=2, repeat=1)
+        self.assertEqual(list(results), list(bench.SCENARIOS))
+        self.assertTrue(all(ns > 0 for ns in results.values()))
+        self.assertEqual(bench.to_json(results)["results"], results)
+
+    def test_main_zero_baseline(self) -> None:
+        import contextlib
+        import io
+        import json
+        import tempfile
+        from src.countdown import bench
+        name = next(iter(bench.SCENARIOS))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            with open(path, "w") as f:
+                json.dump(bench.to_json({name: 0.0}), f)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                code = bench.main(["-k", name, "-n", "2", "-r", "1", "--compare", path])
+        self.assertEqual(code, 0)
+        self.assertNotIn("baseline", out.getvalue())
+
+
+class TestTemplateCache(unittest.TestCase):
+    def test_interned(self) -> None:
+        from src.countdown import _plan
+        _plan.template_cache_clear()
+        cd1 = countdown.Countdown("{h}{hd}:{m}", hd="h")
+        cd2 = countdown.Countdown("{h}{hd}:{m}", hd="h")
+        self.assertIs(cd1.plan, cd2.plan)
+        self.assertIs(cd1.flags, cd2.flags)
+        self.assertEqual(tuple(_plan.template_cache_info())[:2], (1, 1))
+        # differing options, default types and unhashable defaults are not shared
+        self.assertIsNot(countdown.Countdown("{h}{hd}:{m}", hd="h", remove_empty=False).plan,
+                         cd1.plan)
+        self.assertEqual(countdown.Countdown("{S}{Sd}", Sd=True).format(1_000_000), "1True")
+        self.assertEqual(countdown.Countdown("{S}{Sd}", Sd=1).format(1_000_000), "11")
+        cd3 = countdown.Countdown("{h}{hd}", hd=["h"])
+        self.assertIsNot(countdown.Countdown("{h}{hd}", hd=["h"]).plan, cd3.plan)
+        self.assertEqual(cd3.format(3_600_000_000), "1['h']")
+        # equal defaults that render differently are not shared either
+        import decimal
+        for default, expected in ((0.0, "10.0"), (-0.0, "1-0.0"),
+                                  (decimal.Decimal("1.0"), "11.0"),
+                                  (decimal.Decimal("1.00"), "11.00")):
+            cd4 = countdown.Countdown("{S}{Sd}", Sd=default)
+            self.assertEqual(cd4.format(1_000_000), expected)
+            self.assertEqual(cd4._format_uncompiled(1_000_000), expected)
+
+    def test_bounded(self) -> None:
+        from src.countdown import _plan
+        _plan.template_cache_clear()
+        for i in range(_plan.TEMPLATE_CACHE_SIZE + 10):
+            countdown.Countdown(f"{{S}}-{i}")
+        self.assertEqual(_plan.template_cache_info().currsize, _plan.TEMPLATE_CACHE_SIZE)
+
+    def test_default(self) -> None:
+        self.assertIs(countdown.Countdown.default, countdown.Countdown.default)
+        self.assertEqual(countdown.Countdown.default.format(90_000_000), "1m 30s")
+
+
+class TestFlagSet(unittest.TestCase):
+    def test_lookup(self) -> None:
+        flags, _ = countdown.formatter.update_fmt("{S}{Sd} {h}{z}{m.p}")
+        self.assertIs(countdown.formatter.Flags, countdown.formatter.FlagSet)
+        self.assertEqual([flag.name for flag in flags], ["z", "h", "m", "S"])
+        self.assertEqual([flag.name for flag in flags.in_template_order()], ["S", "h", "z", "m"])
+        self.assertIn("m", flags)
+        self.assertIn(flags[0], flags)
+        self.assertNotIn("d", flags)
+        self.assertIs(flags["h"], flags[1])
+        self.assertIs(flags[flags[2]], flags.get("m"))
+        self.assertEqual(flags.get("S").extras, {"Sd"})
+        self.assertIsNone(flags.get("d", None))
+        self.assertIsNone(flags.get(10, None))
+        with self.assertRaises(KeyError):
+            flags["d"]
+        self.assertEqual(flags[1:3], [flags["h"], flags["m"]])
+
+    def test_frozen(self) -> None:
+        flags = cd.flags
+        self.assertTrue(flags.frozen)
+        with self.assertRaises(TypeError):
+            flags.append(countdown.formatter.Flag("d"))
+        unfrozen = countdown.formatter.FlagSet([countdown.formatter.Flag("u"),
+                                                countdown.formatter.Flag("y")])
+        self.assertFalse(unfrozen.frozen)
+        self.assertEqual([flag.name for flag in unfrozen], ["y", "u"])
+
+
+class TestNanoseconds(unittest.TestCase):
+    def test_exact_timedelta(self) -> None:
+        td = datetime.timedelta(days=365 * 300, microseconds=7)
+        self.assertEqual(countdown.Countdown("{u}").format_timedelta(td), "9460800000000007")
+        self.assertEqual(countdown.Countdown("{u}").format_many([td]), ["9460800000000007"])
+
+    def test_format_ns(self) -> None:
+        cd2 = countdown.Countdown("{z}{S}.{u}", remove_empty=False)
+        self.assertEqual(cd2.format_ns(1_000_002_999), "+1.2")
+        self.assertEqual(cd2.format_ns(-1_999), "-0.1")
+        self.assertEqual(cd2.format_ns(-999), "-0.0")
+        self.assertEqual(cd2.format_ns(10 ** 24 + 1_000), cd2.format(10 ** 21 + 1))
+
+    def test_n_unit(self) -> None:
+        cd2 = countdown.Countdown("{z}{S}.{s}.{u}.{n}", remove_empty=False)
+        self.assertEqual(cd2.plan.scale, 1_000)
+        self.assertEqual(cd2.format_ns(1_234_567_891), "+1.234.567.891")
+        self.assertEqual(cd2.format(1_234_567), "+1.234.567.0")
+        self.assertEqual(cd2.format_ns(-5), "-0.0.0.5")
+        self.assertEqual(cd2._format_uncompiled(1_234_567_891), "+1.234.567.891")
+        self.assertEqual(cd2.next_change(3), 1)
+        tval = cd2.parse("-1.2.3.4", strict=True)
+        self.assertEqual((tval.n, tval.total_nanoseconds(), tval.total_microseconds()),
+                         (4, -1_002_003_004, -1_002_003))
+        self.assertEqual(cd2.compile_parser(True).parse_total("+0.0.1.999"), 1)
+        cd3 = countdown.Countdown("{S}{Sd} {n}{nd}", Sd="s", nd="ns")
+        self.assertEqual(cd3.parse("2s 5ns").n, 5)
+        self.assertEqual(list(cd3.parse_many(["2s 5ns"], as_int=True)), [2_000_000])
+
+
+def _seconds_suffix(tval: countdown.TimeValue) -> str:
+    return "s" if tval.S != 1 else " second"
+
+
+class TestParallel(unittest.TestCase):
+    def test_pickle(self) -> None:
+        import pickle
+        cd2 = countdown.Countdown("{m}{md} {S}{Sd}", max_value=99, cache_size=8, md="m",
+                                  Sd=_seconds_suffix, instrument=True)
+        clone = pickle.loads(pickle.dumps(cd2))
+        self.assertEqual(clone.format(61_000_000), "1m 1 second")
+        self.assertEqual(clone.format(10 ** 12), cd2.format(10 ** 12))
+        cd3 = pickle.loads(pickle.dumps(countdown.Countdown("{S}", cache_size=8)))
+        self.assertEqual(cd3.cache_info().maxsize, 8)
+        self.assertIsNone(clone.instrumentation)
+        self.assertIs(clone.plan, cd2.plan)
+        with self.assertRaises(Exception):
+            pickle.dumps(countdown.Countdown("{S}{Sd}", Sd=lambda tval: "s"))
+
+    def test_format_parallel(self) -> None:
+        rng = random.Random(0)
+        values = [rng.randint(-10 ** 14, 10 ** 14) for _ in range(500)]
+        expected = cd.format_many(values)
+        for workers in (1, 2):
+            self.assertEqual(list(cd.format_parallel(values, workers=workers, chunksize=37)),
+                             expected)
+        cd2 = countdown.Countdown("{S}{Sd}", Sd=_seconds_suffix)
+        self.assertEqual(list(cd2.format_parallel([1, 2, 1], workers=2, chunksize=1,
+                                                  unit="seconds")), ["1 second", "2s", "1 second"])
+        with self.assertRaises(ValueError):
+            cd.format_parallel(values, unit="fortnights")
+        with self.assertRaises(ValueError):
+            cd.format_parallel(values, chunksize=0)
+        with self.assertRaises(ValueError):
+            cd.parse_parallel([], workers=0)
+
+    def test_parse_parallel(self) -> None:
+        values = list(range(0, 10 ** 12, 10 ** 10))
+        lines = cd.format_many(values)
+        self.assertEqual(list(cd.parse_parallel(lines, workers=2, chunksize=16, as_int=True)),
+                         values)
+        lines[3] = "garbage"
+        self.assertEqual(len(list(cd.parse_parallel(lines, workers=2, chunksize=16, strict=True,
+                                                    errors="skip"))), len(values) - 1)
+        with self.assertRaises(countdown.exceptions.ParseError):
+            list(cd.parse_parallel(lines, workers=2, chunksize=16, strict=True))
+        sentinel = object()
+        for workers in (1, 2):
+            results = list(cd.parse_parallel(lines, workers=workers, chunksize=16, strict=True,
+                                             as_int=True, errors="sentinel", sentinel=sentinel))
+            self.assertIs(results[3], sentinel)
+            self.assertEqual(results[:3] + results[4:], values[:3] + values[4:])
+
+
+class TestCLI(unittest.TestCase):
+    def run_cli(self, argv: list[str], data: bytes) -> bytes:
+        import io
+        import gc
+        from src.countdown import __main__
+        stdin = io.BytesIO(data)
+        out = io.BytesIO()
+        self.assertEqual(__main__.main(argv, stdin, out), 0)
+        gc.collect()
+        # the caller's streams are left open
+        self.assertFalse(stdin.closed)
+        return out.getvalue()
+
+    def test_format(self) -> None:
+        self.assertEqual(self.run_cli(["format"], b"90000000\n3600000000\r\n"), b"1m 30s\n1h\n")
+        self.assertEqual(self.run_cli(["format", "-u", "seconds", "-f", "{S}{Sd}", "-D", "Sd=!",
+                                       "--keep-empty"], b"1.5\n0\n"), b"1!\n0!\n")
+        self.assertEqual(self.run_cli(["format", "-u", "timedelta", "-f", "{z}{d}d {u}"],
+                                      b"1 day, 2:03:04.5\n-0:00:00.000001\n"),
+                         b"+1d 7384500000\n-d 1\n")
+        self.assertEqual(self.run_cli(["format", "-j", "2"], b"90000000\n" * 3),
+                         b"1m 30s\n" * 3)
+        self.assertEqual(self.run_cli(["format"], b"90000000\n\n  \n1.5e6\n"), b"1m 30s\n1s\n")
+        self.assertEqual(self.run_cli(["format", "-u", "timedelta"], b"0:01:30\n\n"), b"1m 30s\n")
+
+    def test_parse(self) -> None:
+        self.assertEqual(self.run_cli(["parse"], b"1m 30s\n2h\n"), b"90000000\n7200000000\n")
+        self.assertEqual(self.run_cli(["parse", "--strict", "--errors", "sentinel",
+                                       "--sentinel", "?"], b"1m 30s\nx\n"), b"90000000\n?\n")
+        self.assertEqual(self.run_cli(["parse", "-f", "{S}\u00e9"], "5\u00e9\n".encode()),
+                         b"5000000\n")
+
+    def test_errors(self) -> None:
+        import contextlib
+        import io
+        from src.countdown import __main__
+        for argv, data, code in ((["format"], b"1:30\n", 2), (["parse", "--strict"], b"x\n", 1),
+                                 (["format", "-D", "a=b"], b"1\n", 2)):
+            with self.assertRaises(SystemExit) as ctx, \
+                    contextlib.redirect_stderr(io.StringIO()):
+                __main__.main(argv, io.BytesIO(data), io.BytesIO())
+            self.assertEqual(ctx.exception.code, code)
+
+
+class TestBuffer(unittest.TestCase):
+    values = [90_000_000, 3_600_000_000, -1, 2 ** 62]
+
+    def test_format_buffer(self) -> None:
+        import array
+        import io
+        expected = "".join(f"{text}\n" for text in cd.format_many(self.values))
+        typed = array.array("q", self.values)
+        raw = b"".join(v.to_bytes(8, "little", signed=True) for v in self.values)
+        for buf in (typed, memoryview(typed), raw, bytearray(raw)):
+            out = io.StringIO()
+            self.assertEqual(cd.format_buffer(buf, out, chunksize=3), len(self.values))
+            self.assertEqual(out.getvalue(), expected)
+        out = io.BytesIO()
+        cd.format_buffer(raw, out, unit="seconds")
+        self.assertEqual(out.getvalue(), "".join(f"{text}\n" for text in cd.format_many(
+            self.values, unit="seconds")).encode())
+        with self.assertRaises(ValueError):
+            cd.format_buffer(raw[:-1], io.StringIO())
+        for typecode in ("d", "i", "Q"):
+            with self.assertRaises(TypeError):
+                cd.format_buffer(array.array(typecode, [1, 2]), io.StringIO())
+
+    def test_format_file(self) -> None:
+        import tempfile
+        import array
+        import io
+        import os
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "durations.bin")
+            with open(path, "wb") as f:
+                array.array("q", self.values).tofile(f)
+            out = io.BytesIO()
+            self.assertEqual(cd.format_file(path, out, chunksize=2), len(self.values))
+            self.assertEqual(out.getvalue().decode().splitlines(), cd.format_many(self.values))
+            open(path, "wb").close()
+            self.assertEqual(cd.format_file(path, out), 0)
+
+    def test_format_into(self) -> None:
+        buf = bytearray(b"xx")
+        self.assertEqual(cd.format_into(90_000_000, buf, 2), len(cd.format(90_000_000)))
+        self.assertEqual(buf.decode(), "xx" + cd.format(90_000_000))
+        view = memoryview(bytearray(8))
+        cd2 = countdown.Countdown.default
+        self.assertEqual(cd2.format_into(90_000_000, view, 1), 6)
+        self.assertEqual(bytes(view), b"\x001m 30s\x00")
+        with self.assertRaises(ValueError):
+            cd2.format_into(90_000_000, view, 3)
+        with self.assertRaises(TypeError):
+            cd2.format_into(90_000_000, b"readonly.")
+
+    def test_format_many_into(self) -> None:
+        buf = bytearray(b"xx")
+        offsets = cd.format_many_into(self.values, buf, 2)
+        self.assertEqual(len(offsets), len(self.values) + 1)
+        self.assertEqual([buf[offsets[i]:offsets[i + 1]].decode() for i in range(len(self.values))],
+                         cd.format_many(self.values))
+        cd2 = countdown.Countdown("{S}{Sd}", Sd="\u00e9")
+        buf = bytearray()
+        self.assertEqual(list(cd2.format_many_into([1_000_000, 20_000_000], buf)), [0, 3, 7])
+        self.assertEqual(buf.decode(), "1\u00e920\u00e9")
+
+
+class TestCalendar(unittest.TestCase):
+    @staticmethod
+    def add_months(dt: datetime.datetime, months: int) -> datetime.datetime:
+        import calendar
+        year, month = divmod(dt.month - 1 + months, 12)
+        year += dt.year
+        return dt.replace(year=year, month=month + 1,
+                          day=min(dt.day, calendar.monthrange(year, month + 1)[1]))
+
+    def test_difference(self) -> None:
+        from src.countdown import _calendar
+        rng = random.Random(0)
+        base = datetime.datetime(1990, 1, 1)
+        for _ in range(500):
+            start = base + datetime.timedelta(microseconds=rng.randint(0, 10 ** 15))
+            end = start + datetime.timedelta(microseconds=rng.randint(0, 10 ** 15))
+            # step month by month as a reference
+            months = 0
+            while self.add_months(start, months + 1) <= end:
+                months += 1
+            anchor = self.add_months(start, months)
+            remainder = countdown.utils.timedelta_to_microseconds(end - anchor)
+            self.assertEqual(_calendar.difference(_calendar.split(start), _calendar.split(end),
+                                                  True, True),
+                             (months // 12, months % 12, remainder))
+
+    def test_format_datetime(self) -> None:
+        cd2 = countdown.Countdown("{z}{y}{yd}{M}{Md}{d}{dd}{h}{hd}", yd="y ", Md="mo ", dd="d ",
+                                  hd="h")
+        jan31 = datetime.datetime(2024, 1, 31, 12)
+        self.assertEqual(cd2.format_datetime(jan31, datetime.datetime(2024, 2, 29, 12),
+                                             calendar=True), "+1mo")
+        self.assertEqual(cd2.format_datetime(jan31, datetime.datetime(2024, 2, 29, 12)),
+                         "+29d")
+        self.assertEqual(cd2.format_datetime(jan31, datetime.datetime(2025, 3, 1, 13),
+                                             calendar=True), "+1y 1mo 1d 1h")
+        self.assertEqual(cd2.format_datetime(datetime.datetime(2025, 3, 1, 13), jan31,
+                                             calendar=True), "-1y 1mo 1d 1h")
+        months_only = countdown.Countdown("{M}mo {d}d", max_value=30)
+        self.assertEqual(months_only.format_datetime(datetime.datetime(2020, 1, 1),
+                                                     datetime.datetime(2023, 1, 2),
+                                                     calendar=True), "30mo 30d")
+        tz = datetime.timezone(datetime.timedelta(hours=2))
+        self.assertEqual(cd2.format_datetime(datetime.datetime(2024, 1, 1, tzinfo=tz),
+                                             datetime.datetime(2024, 1, 31, 22,
+                                                               tzinfo=datetime.timezone.utc),
+                                             calendar=True), "+1mo")
+
+    def test_format_datetimes(self) -> None:
+        reference = datetime.datetime(2024, 1, 15)
+        deadlines = [reference + datetime.timedelta(days=days) for days in range(-400, 400, 7)]
+        for calendar in (False, True):
+            self.assertEqual(cd.format_datetimes(deadlines, reference, calendar=calendar),
+                             [cd.format_datetime(deadline, reference, calendar=calendar)
+                              for deadline in deadlines])
+
+    def test_format_datetimes_default_reference(self) -> None:
+        cd2 = countdown.Countdown("{z}{d}d")
+        tz = datetime.timezone(datetime.timedelta(hours=5))
+        deadline = datetime.datetime.now(tz) + datetime.timedelta(days=2, minutes=1)
+        naive = datetime.datetime.now() - datetime.timedelta(days=3, minutes=1)
+        for calendar in (False, True):
+            self.assertEqual(cd2.format_datetimes([deadline, deadline.astimezone(
+                datetime.timezone.utc)], calendar=calendar), ["-2d", "-2d"])
+            self.assertEqual(cd2.format_datetimes([naive], calendar=calendar), ["+3d"])
+            self.assertEqual(cd2.format_datetimes([naive], calendar=calendar),
+                             [cd2.format_datetime(naive, calendar=calendar)])
+            self.assertEqual(cd2.format_datetimes([], calendar=calendar), [])
+            with self.assertRaises(TypeError):
+                cd2.format_datetimes([deadline, naive], calendar=calendar)
+            with self.assertRaises(TypeError):
+                cd2.format_datetime(naive, deadline, calendar=calendar)
+
+
 if __name__ == "__main__":
     unittest.main()